@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 SQLALCHEMY_DATABASE_URL = "sqlite:////config/releasarr.db"
@@ -8,3 +8,20 @@ engine = create_engine(
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+# Provider responses live in their own file, so cache writes from fetch threads never
+# wait on the main database's write lock.
+CACHE_DATABASE_URL = "sqlite:////config/provider_cache.db"
+
+cache_engine = create_engine(
+    CACHE_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+CacheSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=cache_engine)
+CacheBase = declarative_base()
+
+@event.listens_for(cache_engine, "connect")
+def _set_cache_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
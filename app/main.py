@@ -1,16 +1,19 @@
 import importlib
 import pkgutil
 import os
+import time
 import logging
 from logging.handlers import RotatingFileHandler
 from contextlib import asynccontextmanager
+from datetime import datetime
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from apscheduler.schedulers.background import BackgroundScheduler
 
-from .db import Base, engine, SessionLocal
-from .utils import importer
+from .db import Base, engine, SessionLocal, CacheBase, cache_engine
+from .utils import importer, worker_pool, jobs, http_client
+from .utils.import_watcher import watcher as import_watcher
 
 log_directory = "logs"
 log_file_path = os.path.join(log_directory, "app.log")
@@ -31,12 +34,38 @@ logger.addHandler(stream_handler)
 
 scheduler = BackgroundScheduler()
 
+# While the watcher runs, a full scan still reconciles the import folder this often:
+# inotify misses changes made by other hosts on network mounts, and drops events when
+# its queue overflows or it runs out of watches.
+RECONCILE_SCAN_SECONDS = 15 * 60
+_last_full_scan: float | None = None
+
+def import_settled_directories(directories: list[str]):
+    db = SessionLocal()
+    try:
+        unmatched_count, matched_count = importer.run_scan(db, directories=directories)
+        logger.info(f"Watcher import complete: {unmatched_count} files remain unmatched, {matched_count} files automatically imported.")
+    except Exception as e:
+        logger.error(f"Error importing settled directories: {e}", exc_info=True)
+    finally:
+        db.close()
+
 def import_scan_job():
-    logger.info("Running scheduled import scan...")
+    global _last_full_scan
     db = SessionLocal()
     try:
-        unmatched_files, matched_count = importer.scan_import_folder(db)
-        logger.info(f"Scheduled scan complete: {len(unmatched_files)} files remain unmatched, {matched_count} files automatically imported.")
+        import_folder_path = importer.get_import_folder_path(db)
+        if import_watcher.is_watching(import_folder_path):
+            if _last_full_scan is not None and time.monotonic() - _last_full_scan < RECONCILE_SCAN_SECONDS:
+                return
+            logger.info("Running reconciliation scan of the watched import folder...")
+        else:
+            if import_watcher.start(import_folder_path, on_settled=import_settled_directories):
+                logger.info("Import folder watcher started. Running a catch-up scan; further imports are event driven.")
+            logger.info("Running scheduled import scan...")
+        _last_full_scan = time.monotonic()
+        unmatched_count, matched_count = importer.run_scan(db)
+        logger.info(f"Scheduled scan complete: {unmatched_count} files remain unmatched, {matched_count} files automatically imported.")
     except Exception as e:
         logger.error(f"Error during scheduled import scan: {e}", exc_info=True)
     finally:
@@ -46,16 +75,20 @@ def import_scan_job():
 async def lifespan(app: FastAPI):
 
     logger.info("Starting scheduler...")
-    scheduler.add_job(import_scan_job, 'interval', minutes=1, id='import_scan_job')
+    scheduler.add_job(import_scan_job, 'interval', minutes=1, id='import_scan_job', next_run_time=datetime.now())
     
     scheduler.start()
-    logger.info("Scheduler started. Import scan will run every minute.")
+    logger.info(f"Scheduler started. The import folder is watched for changes when possible, with a full scan every {RECONCILE_SCAN_SECONDS // 60} minutes, and polled every minute otherwise.")
     
     yield
     
     logger.info("Shutting down scheduler...")
+    import_watcher.stop()
     scheduler.shutdown()
     logger.info("Scheduler shut down.")
+    jobs.shutdown()
+    worker_pool.shutdown()
+    http_client.shutdown()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -73,4 +106,5 @@ for finder, name, ispkg in pkgutil.iter_modules([routers_path]):
     except Exception as e:
         logger.error(f"Failed to include router {module_path}: {e}")
 
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+Base.metadata.create_all(bind=engine)
+CacheBase.metadata.create_all(bind=cache_engine)
\ No newline at end of file
@@ -1,8 +1,8 @@
 # app/models.py
 
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Float, LargeBinary
 from sqlalchemy.orm import relationship
-from .db import Base
+from .db import Base, CacheBase
 
 
 class Config(Base):
@@ -132,6 +132,91 @@ class ImportedFile(Base):
     ReleaseId = Column(Integer, ForeignKey("release.Id"), nullable=False)
     ArtistId = Column(Integer, ForeignKey("artist.Id"), nullable=False)
     track = relationship("Track")
+    release = relationship("Release")
+    artist = relationship("Artist")
 
     def __repr__(self):
-        return f"<ImportedFile(Id={self.Id}, FileName='{self.FileName}', TrackId={self.TrackId})>"
\ No newline at end of file
+        return f"<ImportedFile(Id={self.Id}, FileName='{self.FileName}', TrackId={self.TrackId})>"
+
+class ImportScanState(Base):
+    __tablename__ = "import_scan_state"
+
+    Id = Column(Integer, primary_key=True, index=True)
+    Path = Column(String, unique=True, nullable=False, index=True)
+    ParentPath = Column(String, nullable=True, index=True)
+    IsDirectory = Column(Boolean, default=False)
+    Size = Column(Integer)
+    MtimeNs = Column(Integer)
+    Inode = Column(Integer)
+    Settled = Column(Boolean, default=False)
+    LastSeen = Column(String)
+
+    def __repr__(self):
+        return f"<ImportScanState(Id={self.Id}, Path='{self.Path}', IsDirectory={self.IsDirectory})>"
+
+
+class FileMetadataCache(Base):
+    __tablename__ = "file_metadata_cache"
+
+    Id = Column(Integer, primary_key=True, index=True)
+    FilePath = Column(String, unique=True, nullable=False, index=True)
+    FileSize = Column(Integer)
+    MtimeNs = Column(Integer)
+    Metadata = Column(String, nullable=False)
+    CachedTimestamp = Column(String)
+
+    def __repr__(self):
+        return f"<FileMetadataCache(Id={self.Id}, FilePath='{self.FilePath}')>"
+
+
+class BackgroundJob(Base):
+    __tablename__ = "background_job"
+
+    Id = Column(Integer, primary_key=True, index=True)
+    Kind = Column(String, nullable=False)
+    Status = Column(String, nullable=False, default="queued")
+    Processed = Column(Integer, default=0)
+    Total = Column(Integer)
+    Message = Column(String)
+    CreatedTimestamp = Column(String)
+    StartedTimestamp = Column(String)
+    FinishedTimestamp = Column(String)
+
+    def __repr__(self):
+        return f"<BackgroundJob(Id={self.Id}, Kind='{self.Kind}', Status='{self.Status}')>"
+
+
+class ImportScanRun(Base):
+    __tablename__ = "import_scan_run"
+
+    Id = Column(Integer, primary_key=True, index=True)
+    StartedTimestamp = Column(String)
+    FinishedTimestamp = Column(String)
+    Scope = Column(String)
+    FilesProcessed = Column(Integer, default=0)
+    FilesMatched = Column(Integer, default=0)
+    FilesUnmatched = Column(Integer, default=0)
+    TotalSeconds = Column(Float)
+    StageSeconds = Column(String)
+    SlowFiles = Column(Integer, default=0)
+
+    def __repr__(self):
+        return f"<ImportScanRun(Id={self.Id}, Scope='{self.Scope}', TotalSeconds={self.TotalSeconds})>"
+
+
+class ProviderResponse(CacheBase):
+    __tablename__ = "provider_response"
+
+    CacheKey = Column(String, primary_key=True)
+    Provider = Column(String, nullable=False)
+    Body = Column(LargeBinary, nullable=False)
+    ContentType = Column(String)
+    ETag = Column(String)
+    LastModified = Column(String)
+    Size = Column(Integer, nullable=False)
+    FetchedTimestamp = Column(Float, nullable=False)
+    ExpiresTimestamp = Column(Float, nullable=False)
+    LastAccessedTimestamp = Column(Float, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ProviderResponse(CacheKey='{self.CacheKey}', Size={self.Size})>"
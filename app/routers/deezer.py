@@ -1,16 +1,24 @@
 # /app/routers/deezer.py 
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from ..models import Release, Artist
 from ..db import SessionLocal
 from ..utils.release_utils import update_release_tracks_if_changed
+from ..utils import http_client
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+DEEZER_FETCH_WORKERS = 8
+DEEZER_QUOTA_ERROR_CODE = 4
+DEEZER_QUOTA_RETRIES = 3
+DEEZER_QUOTA_WAIT_SECONDS = 5
+
 def get_db():
     db = SessionLocal()
     try:
@@ -18,6 +26,29 @@ def get_db():
     finally:
         db.close()
 
+def _get_json(client: http_client.ProviderClient, url: str) -> dict:
+    # Deezer reports errors, including its request quota, in a 200 response body.
+    for attempt in range(DEEZER_QUOTA_RETRIES + 1):
+        response = client.get(url)
+        response.raise_for_status()
+        data = response.json()
+        error = data.get("error") if isinstance(data, dict) else None
+        if not error:
+            return data
+        if error.get("code") != DEEZER_QUOTA_ERROR_CODE or attempt == DEEZER_QUOTA_RETRIES:
+            raise requests.exceptions.HTTPError(f"Deezer error for {url}: {error.get('message', error)}", response=response)
+        logger.warning(f"Deezer quota exceeded, retrying {url} in {DEEZER_QUOTA_WAIT_SECONDS}s.")
+        time.sleep(DEEZER_QUOTA_WAIT_SECONDS)
+
+def _fetch_album_tracks(client: http_client.ProviderClient, album_id: str) -> list[dict]:
+    track_data = _get_json(client, f"https://api.deezer.com/album/{album_id}/tracks").get("data", [])
+    return [{
+        "Title": item.get("title", "").strip(),
+        "Duration": item.get("duration"),
+        "TrackNumber": item.get("track_position"),
+        "DiscNumber": item.get("disk_number", 1)
+    } for item in track_data if item.get("title") and item.get("track_position") is not None]
+
 def process_deezer_fetch(artist_id: int):
     db = next(get_db())
     try:
@@ -26,6 +57,7 @@ def process_deezer_fetch(artist_id: int):
             logger.error(f"Background task failed: Artist {artist_id} not found or has no Deezer ID.")
             return
 
+        client = http_client.get_client("deezer", db)
         success_messages = []
         error_messages = []
         releases_processed_count = 0
@@ -33,9 +65,7 @@ def process_deezer_fetch(artist_id: int):
 
         try:
             artist_url = f"https://api.deezer.com/artist/{artist.DeezerId}"
-            artist_resp = requests.get(artist_url, timeout=10)
-            artist_resp.raise_for_status()
-            artist_data = artist_resp.json()
+            artist_data = _get_json(client, artist_url)
             image_url = artist_data.get("picture_xl") or artist_data.get("picture_big")
             if image_url and (not artist.ImageUrl or "picture" in artist.ImageUrl):
                 artist.ImageUrl = image_url
@@ -54,9 +84,7 @@ def process_deezer_fetch(artist_id: int):
         url = f"https://api.deezer.com/artist/{artist.DeezerId}/albums"
         try:
             while url:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                data = response.json()
+                data = _get_json(client, url)
                 albums.extend(data.get('data', []))
                 url = data.get('next')
             success_messages.append(f"Fetched {len(albums)} albums from Deezer for {artist.Name}.")
@@ -70,56 +98,55 @@ def process_deezer_fetch(artist_id: int):
             logger.error(f"Unexpected error during album fetching for {artist.Name} (ID: {artist_id}): {e}")
             return
 
-        for album in albums:
-            try:
-                album_id = str(album['id'])
-                title = album['title']
-                release_date = album.get('release_date')
-                year = int(release_date[:4]) if release_date else None
-                cover_url = album.get('cover_xl') or album.get('cover_big') or album.get('cover_medium')
-
-                existing = db.query(Release).filter(Release.DeezerId == album_id).first()
-                if existing:
-                    existing.Title = title
-                    existing.Year = year
-                    if cover_url and (not existing.Cover_Url or "cover" in existing.Cover_Url):
-                        existing.Cover_Url = cover_url
-                    release = existing
-                    logger.info(f"Updating existing Deezer release: {title} (ID: {album_id})")
-                else:
-                    release = Release(Title=title, Year=year, DeezerId=album_id, ArtistId=artist_id, Cover_Url=cover_url)
-                    db.add(release)
-                    db.flush()
-                    logger.info(f"Adding new Deezer release: {title} (ID: {album_id})")
-
-                track_url = f"https://api.deezer.com/album/{album_id}/tracks"
-                resp = requests.get(track_url, timeout=10)
-                resp.raise_for_status()
-
-                track_data = resp.json().get("data", [])
-                incoming_tracks = [{
-                    "Title": item.get("title", "").strip(),
-                    "Duration": item.get("duration"),
-                    "TrackNumber": item.get("track_position"),
-                    "DiscNumber": item.get("disk_number", 1)
-                } for item in track_data if item.get("title") and item.get("track_position") is not None]
-
-                if update_release_tracks_if_changed(db, release, incoming_tracks):
-                    db.commit()
-                    releases_processed_count += 1
-                    tracks_updated_count += len(incoming_tracks)
-                    logger.info(f"Tracks updated for release {title} (ID: {album_id}). Total: {len(incoming_tracks)}")
-                else:
-                    logger.info(f"No track changes for release {title} (ID: {album_id}).")
-
-            except requests.exceptions.RequestException as e:
-                error_messages.append(f"Failed to process Deezer release {album.get('title', 'N/A')}: {e}.")
-                logger.error(f"Failed to process Deezer release {album.get('title', 'N/A')}: {e}")
-                db.rollback()
-            except Exception as e:
-                error_messages.append(f"Unexpected error while processing Deezer release {album.get('title', 'N/A')}: {e}.")
-                logger.error(f"Unexpected error while processing Deezer release {album.get('title', 'N/A')}: {e}")
-                db.rollback()
+        with ThreadPoolExecutor(max_workers=DEEZER_FETCH_WORKERS, thread_name_prefix="deezer-fetch") as executor:
+            track_futures = []
+            for album in albums:
+                try:
+                    track_futures.append((album, executor.submit(_fetch_album_tracks, client, str(album['id']))))
+                except Exception as e:
+                    error_messages.append(f"Unexpected error while processing Deezer release {album.get('title', 'N/A')}: {e}.")
+                    logger.error(f"Unexpected error while processing Deezer release {album.get('title', 'N/A')}: {e}")
+
+            for album, track_future in track_futures:
+                try:
+                    incoming_tracks = track_future.result()
+
+                    album_id = str(album['id'])
+                    title = album['title']
+                    release_date = album.get('release_date')
+                    year = int(release_date[:4]) if release_date else None
+                    cover_url = album.get('cover_xl') or album.get('cover_big') or album.get('cover_medium')
+
+                    existing = db.query(Release).filter(Release.DeezerId == album_id).first()
+                    if existing:
+                        existing.Title = title
+                        existing.Year = year
+                        if cover_url and (not existing.Cover_Url or "cover" in existing.Cover_Url):
+                            existing.Cover_Url = cover_url
+                        release = existing
+                        logger.info(f"Updating existing Deezer release: {title} (ID: {album_id})")
+                    else:
+                        release = Release(Title=title, Year=year, DeezerId=album_id, ArtistId=artist_id, Cover_Url=cover_url)
+                        db.add(release)
+                        db.flush()
+                        logger.info(f"Adding new Deezer release: {title} (ID: {album_id})")
+
+                    if update_release_tracks_if_changed(db, release, incoming_tracks):
+                        db.commit()
+                        releases_processed_count += 1
+                        tracks_updated_count += len(incoming_tracks)
+                        logger.info(f"Tracks updated for release {title} (ID: {album_id}). Total: {len(incoming_tracks)}")
+                    else:
+                        logger.info(f"No track changes for release {title} (ID: {album_id}).")
+
+                except requests.exceptions.RequestException as e:
+                    error_messages.append(f"Failed to process Deezer release {album.get('title', 'N/A')}: {e}.")
+                    logger.error(f"Failed to process Deezer release {album.get('title', 'N/A')}: {e}")
+                    db.rollback()
+                except Exception as e:
+                    error_messages.append(f"Unexpected error while processing Deezer release {album.get('title', 'N/A')}: {e}.")
+                    logger.error(f"Unexpected error while processing Deezer release {album.get('title', 'N/A')}: {e}")
+                    db.rollback()
     finally:
         db.close()
 
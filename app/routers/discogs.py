@@ -5,8 +5,8 @@ from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from ..models import Release, Artist, Track, Config
 from ..db import SessionLocal
-import requests
 from ..utils.release_utils import update_release_tracks_if_changed
+from ..utils import http_client
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -34,17 +34,15 @@ def fetch_discogs_releases(artist_id: int, db: Session = Depends(get_db)):
     if not discogs_api_key:
         raise HTTPException(status_code=400, detail="Discogs API key is empty")
 
-    headers = {
-        "User-Agent": "Releasarr/1.0",
-        "Authorization": f"Discogs token={discogs_api_key}",
-    }
+    client = http_client.get_client("discogs", db)
+    headers = {"Authorization": f"Discogs token={discogs_api_key}"}
 
     releases = []
     page = 1
     per_page = 100
     while True:
         url = f"https://api.discogs.com/artists/{artist.DiscogsId}/releases?page={page}&per_page={per_page}"
-        response = requests.get(url, headers=headers)
+        response = client.get(url, headers=headers)
         if response.status_code != 200:
             raise HTTPException(status_code=500, detail=f"Failed to fetch releases from Discogs (status {response.status_code})")
 
@@ -85,7 +83,7 @@ def fetch_discogs_releases(artist_id: int, db: Session = Depends(get_db)):
             db.flush()
 
         release_url = f"https://api.discogs.com/releases/{release_id}"
-        release_resp = requests.get(release_url, headers=headers)
+        release_resp = client.get(release_url, headers=headers)
         if release_resp.status_code != 200:
             continue
 
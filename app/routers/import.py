@@ -1,13 +1,13 @@
 # app/routers/import_router.py
 import os
 import logging
-from fastapi import APIRouter, Request, HTTPException, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, Request, HTTPException, Depends, Form
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from ..db import SessionLocal
 from ..models import Config, UnmatchedFile
-from ..utils import importer
+from ..utils import importer, jobs
 from urllib.parse import quote
 
 router = APIRouter()
@@ -21,14 +21,61 @@ def get_db():
     finally:
         db.close()
 
+def _scan_job(progress) -> str:
+    db = SessionLocal()
+    try:
+        unmatched_count, matched_count = importer.run_scan(db, progress=progress)
+        return f"{unmatched_count} new files added for matching. {matched_count} new files have been automaticly matched"
+    finally:
+        db.close()
+
+JOB_TITLES = {
+    "import_scan": "Import Scan",
+    "bulk_match": "Bulk Match",
+    "bulk_ignore": "Bulk Ignore",
+}
+
+def _bulk_match_job(file_ids: list[int] | None, directory: str | None):
+    def run(progress) -> str:
+        db = SessionLocal()
+        try:
+            matched_count, total = importer.match_unmatched_files(db, file_ids=file_ids, directory=directory, progress=progress)
+            return f"{matched_count} of {total} files successfully matched and imported."
+        finally:
+            db.close()
+    return run
+
+def _bulk_ignore_job(file_ids: list[int] | None, directory: str | None):
+    def run(progress) -> str:
+        db = SessionLocal()
+        try:
+            ignored_count = importer.ignore_unmatched_files(db, file_ids=file_ids, directory=directory, progress=progress)
+            return f"{ignored_count} files ignored."
+        finally:
+            db.close()
+    return run
+
+def _bulk_selection(scope: str, file_ids: list[int], directory: str) -> tuple[list[int] | None, str | None]:
+    if scope == "all":
+        return None, None
+    if scope == "directory":
+        if not directory:
+            raise ValueError("No directory selected.")
+        return None, directory
+    if not file_ids:
+        raise ValueError("No files selected.")
+    return file_ids, None
+
 @router.get("/import", response_class=HTMLResponse)
-async def get_import_page(request: Request, db: Session = Depends(get_db)):
+def get_import_page(request: Request, directory: str | None = None, after: str | None = None, before: str | None = None, group_after: str | None = None, db: Session = Depends(get_db)):
     library_folder_path = None
     import_folder_path = None
     message = request.query_params.get('message')
     error_message = request.query_params.get('error_message')
     
-    unmatched_files = []
+    unmatched_page = importer.UnmatchedPage([], None, None)
+    unmatched_groups = []
+    unmatched_count = 0
 
     try:
         lib_config_entry = db.query(Config).filter(Config.Key == "LibraryFolderPath").first()
@@ -46,8 +93,10 @@ async def get_import_page(request: Request, db: Session = Depends(get_db)):
             error_message = error_message or f"Configured import folder path does not exist or is not a directory: {import_folder_path}. Please check your settings."
             logger.warning(f"Configured import folder path does not exist: {import_folder_path}")
         else:
-            unmatched_files = importer.get_unmatched_files(db)
-            logger.info(f"Found {len(unmatched_files)} unmatched files.")
+            unmatched_count = importer.count_unmatched_files(db)
+            unmatched_groups = importer.get_unmatched_groups(db, after=group_after)
+            unmatched_page = importer.get_unmatched_page(db, directory=directory, after=after, before=before)
+            logger.info(f"Found {unmatched_count} unmatched files.")
 
     except Exception as e:
         error_message = f"An unexpected error occurred while retrieving settings or unmatched files: {e}"
@@ -61,12 +110,18 @@ async def get_import_page(request: Request, db: Session = Depends(get_db)):
             "import_folder_path": import_folder_path,
             "message": message,
             "error_message": error_message,
-            "unmatched_files": unmatched_files
+            "unmatched_files": unmatched_page.files,
+            "next_after": unmatched_page.next_after,
+            "previous_before": unmatched_page.previous_before,
+            "unmatched_groups": unmatched_groups,
+            "unmatched_count": unmatched_count,
+            "next_group_after": unmatched_groups[-1][0] if len(unmatched_groups) >= importer.UNMATCHED_GROUP_LIMIT else None,
+            "directory": directory
         }
     )
 
 @router.post("/import/scan")
-async def scan_import_folder(request: Request, db: Session = Depends(get_db)):
+def scan_import_folder(request: Request, db: Session = Depends(get_db)):
 
     import_folder_path = None
     try:
@@ -85,23 +140,52 @@ async def scan_import_folder(request: Request, db: Session = Depends(get_db)):
                 status_code=303
             )
 
-        unmatched_files, matched_count = importer.scan_import_folder(db)
-        
-        return RedirectResponse(
-            url=f"/import?message={len(unmatched_files)} new files added for matching. {(matched_count)} new files have been automaticly matched",
-            status_code=303
-        )
+        job = jobs.submit_job(db, "import_scan", _scan_job)
+
+        return RedirectResponse(url=f"/import/jobs/{job.Id}", status_code=303)
 
     except Exception as e:
         db.rollback()
         logger.error(f"Error during import folder scan: {e}", exc_info=True)
         return RedirectResponse(
-            url=f"/import?error_message=An error occurred during scan: {e}",
+            url=f"/import?error_message=An error occurred while starting the scan: {e}",
             status_code=303
         )
 
+@router.get("/import/jobs/{job_id}", response_class=HTMLResponse)
+def get_import_job_page(request: Request, job_id: int, db: Session = Depends(get_db)):
+    job = jobs.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return templates.TemplateResponse(
+        "import_job.html",
+        {
+            "request": request,
+            "job": job,
+            "job_title": JOB_TITLES.get(job.Kind, job.Kind),
+            "finished": job.Status in jobs.FINISHED_STATUSES
+        }
+    )
+
+@router.get("/import/jobs/{job_id}/status")
+def get_import_job_status(job_id: int, db: Session = Depends(get_db)):
+    job = jobs.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JSONResponse({
+        "id": job.Id,
+        "kind": job.Kind,
+        "status": job.Status,
+        "processed": job.Processed,
+        "total": job.Total,
+        "message": job.Message,
+        "created": job.CreatedTimestamp,
+        "started": job.StartedTimestamp,
+        "finished": job.FinishedTimestamp
+    })
+
 @router.post("/import/match/{file_id}")
-async def match_file_endpoint(file_id: int, db: Session = Depends(get_db)):
+def match_file_endpoint(file_id: int, db: Session = Depends(get_db)):
     try:
         success = importer.match_unmatched_file(db, file_id)
         if success:
@@ -114,7 +198,7 @@ async def match_file_endpoint(file_id: int, db: Session = Depends(get_db)):
         return RedirectResponse(url=f"/import?error_message=Error matching file: {e}", status_code=303)
 
 @router.post("/import/ignore/{file_id}")
-async def ignore_file_endpoint(file_id: int, db: Session = Depends(get_db)):
+def ignore_file_endpoint(file_id: int, db: Session = Depends(get_db)):
     try:
         success = importer.ignore_unmatched_file(db, file_id)
         if success:
@@ -125,3 +209,29 @@ async def ignore_file_endpoint(file_id: int, db: Session = Depends(get_db)):
         db.rollback()
         logger.error(f"Error ignoring file ID {file_id}: {e}", exc_info=True)
         return RedirectResponse(url=f"/import?error_message=Error ignoring file: {e}", status_code=303)
+
+@router.post("/import/bulk-match")
+def bulk_match_endpoint(scope: str = Form("selected"), file_ids: list[int] = Form([]), directory: str = Form(""), db: Session = Depends(get_db)):
+    try:
+        selected_ids, selected_directory = _bulk_selection(scope, file_ids, directory)
+        job = jobs.submit_job(db, "bulk_match", _bulk_match_job(selected_ids, selected_directory))
+        return RedirectResponse(url=f"/import/jobs/{job.Id}", status_code=303)
+    except ValueError as e:
+        return RedirectResponse(url=f"/import?error_message={quote(str(e))}", status_code=303)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error starting bulk match: {e}", exc_info=True)
+        return RedirectResponse(url=f"/import?error_message=Error starting bulk match: {quote(str(e))}", status_code=303)
+
+@router.post("/import/bulk-ignore")
+def bulk_ignore_endpoint(scope: str = Form("selected"), file_ids: list[int] = Form([]), directory: str = Form(""), db: Session = Depends(get_db)):
+    try:
+        selected_ids, selected_directory = _bulk_selection(scope, file_ids, directory)
+        job = jobs.submit_job(db, "bulk_ignore", _bulk_ignore_job(selected_ids, selected_directory))
+        return RedirectResponse(url=f"/import/jobs/{job.Id}", status_code=303)
+    except ValueError as e:
+        return RedirectResponse(url=f"/import?error_message={quote(str(e))}", status_code=303)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error starting bulk ignore: {e}", exc_info=True)
+        return RedirectResponse(url=f"/import?error_message=Error starting bulk ignore: {quote(str(e))}", status_code=303)
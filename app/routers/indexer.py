@@ -5,6 +5,7 @@ from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from ..db import SessionLocal
 from ..models import Config, Indexer
+from ..utils import http_client
 import requests
 
 router = APIRouter()
@@ -110,7 +111,7 @@ def _send_indexer_test_request(indexer_url: str, indexer_api_key: str):
 
     try:
         test_url = f"{indexer_url.rstrip('/')}/api?t=caps&apikey={indexer_api_key}"
-        response = requests.get(test_url, timeout=10)
+        response = http_client.get_client("indexer").get(test_url)
 
         if response.status_code == 200:
             if "caps" in response.text.lower() or "error" not in response.text.lower():
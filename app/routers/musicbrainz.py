@@ -6,11 +6,14 @@ from sqlalchemy.orm import Session
 from ..models import Release, Artist
 from ..db import SessionLocal
 from ..utils.release_utils import update_release_tracks_if_changed
+from ..utils import http_client
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+MUSICBRAINZ_BROWSE_LIMIT = 100
+
 def get_db():
     db = SessionLocal()
     try:
@@ -27,11 +30,12 @@ def process_musicbrainz_fetch(artist_id: int):
             return
 
         mbid = artist.MusicbrainzId
-        headers = {"User-Agent": "Releasarr/1.0"}
+        client = http_client.get_client("musicbrainz", db)
+        cover_client = http_client.get_client("coverartarchive", db)
 
         artist_url = f"https://musicbrainz.org/ws/2/artist/{mbid}?inc=url-rels&fmt=json"
         try:
-            resp = requests.get(artist_url, headers=headers, timeout=10)
+            resp = client.get(artist_url)
             resp.raise_for_status()
             data = resp.json()
 
@@ -63,58 +67,44 @@ def process_musicbrainz_fetch(artist_id: int):
             db.rollback()
             return
 
+        # Track lists come inline with the browse, so the only other requests are
+        # cover art lookups for the release picked in each group.
         offset = 0
+        browse_requests = 0
         all_releases = []
         while True:
-            url = f"https://musicbrainz.org/ws/2/release?artist={mbid}&fmt=json&limit=100&offset={offset}"
+            url = f"https://musicbrainz.org/ws/2/release?artist={mbid}&inc=release-groups+media+recordings&fmt=json&limit={MUSICBRAINZ_BROWSE_LIMIT}&offset={offset}"
             try:
-                resp = requests.get(url, headers=headers, timeout=10)
+                resp = client.get(url)
+                browse_requests += 1
                 resp.raise_for_status()
                 release_data = resp.json()
                 releases = release_data.get("releases", [])
                 all_releases.extend(releases)
-                offset += 100
-                if len(all_releases) >= release_data.get("release-count", 0) or not releases:
+                offset += len(releases)
+                if offset >= release_data.get("release-count", 0) or not releases:
                     break
             except requests.exceptions.RequestException as e:
                 logger.error(f"Failed to fetch releases for {artist.Name} (ID: {artist_id}): {e}")
                 return
         
-        logger.info(f"Fetched {len(all_releases)} releases from MusicBrainz for {artist.Name}.")
+        logger.info(f"Fetched {len(all_releases)} releases from MusicBrainz for {artist.Name} in {browse_requests} browse requests.")
 
         release_groups = {}
         for r in all_releases:
             release_group_id = r.get("release-group", {}).get("id")
             if not release_group_id:
                 continue
-            
-            release_id = r.get("id")
-            
-            track_count = 0
-            tracks_data = None
-            try:
-                track_resp = requests.get(
-                    f"https://musicbrainz.org/ws/2/release/{release_id}?inc=recordings&fmt=json",
-                    headers=headers, timeout=10
-                )
-                if track_resp.status_code == 200:
-                    tracks_data = track_resp.json()
-                    for medium in tracks_data.get("media", []):
-                        track_count += len(medium.get("tracks", []))
-            except Exception as e:
-                logger.error(f"Error fetching tracks for release {release_id}: {e}")
-                pass
 
+            track_count = sum(len(medium.get("tracks") or []) for medium in r.get("media", []))
             if release_group_id not in release_groups or track_count > release_groups[release_group_id]["track_count"]:
                 release_groups[release_group_id] = {
                     "release": r,
                     "track_count": track_count,
-                    "tracks_data": tracks_data,
                 }
         
         for group_id, info in release_groups.items():
             r = info["release"]
-            tracks_data = info["tracks_data"]
 
             release_id = r.get("id")
             title = r.get("title")
@@ -122,18 +112,19 @@ def process_musicbrainz_fetch(artist_id: int):
             year = int(date[:4]) if date and len(date) >= 4 else None
 
             cover_url = None
-            try:
-                cover_resp = requests.get(f"http://coverartarchive.org/release/{release_id}", timeout=10)
-                if cover_resp.status_code == 200:
-                    img_data = cover_resp.json()
-                    if img_data.get("images"):
-                        img = img_data["images"][0]
-                        cover_url = img.get("thumbnails", {}).get("large") or img.get("image")
-            except Exception as e:
-                logger.error(f"Error fetching cover art for release {release_id}: {e}")
-                pass
-
-            existing = db.query(Release).filter(Release.MusicbrainzReleaseId == release_id).first()
+            if r.get("cover-art-archive", {}).get("front") is not False:
+                try:
+                    cover_resp = cover_client.get(f"https://coverartarchive.org/release/{release_id}")
+                    if cover_resp.status_code == 200:
+                        img_data = cover_resp.json()
+                        if img_data.get("images"):
+                            img = img_data["images"][0]
+                            cover_url = img.get("thumbnails", {}).get("large") or img.get("image")
+                except Exception as e:
+                    logger.error(f"Error fetching cover art for release {release_id}: {e}")
+                    pass
+
+            existing = db.query(Release).filter(Release.MusicbrainzId == release_id).first()
             if existing:
                 existing.Title = title
                 existing.Year = year
@@ -144,7 +135,7 @@ def process_musicbrainz_fetch(artist_id: int):
                 release = Release(
                     Title=title,
                     Year=year,
-                    MusicbrainzReleaseId=release_id,
+                    MusicbrainzId=release_id,
                     ArtistId=artist_id,
                     Cover_Url=cover_url,
                 )
@@ -152,20 +143,19 @@ def process_musicbrainz_fetch(artist_id: int):
                 db.flush()
 
             incoming_tracks = []
-            if tracks_data:
-                for medium in tracks_data.get("media", []):
-                    disc_number = medium.get("position", 1)
-                    for t in medium.get("tracks", []):
-                        track_title = t.get("title")
-                        length = int(t.get("length", 0) / 1000) if t.get("length") else None
-                        track_number = t.get("position")
-                        if track_title and track_number is not None:
-                            incoming_tracks.append({
-                                "Title": track_title,
-                                "Duration": length,
-                                "TrackNumber": track_number,
-                                "DiscNumber": disc_number
-                            })
+            for medium in r.get("media", []):
+                disc_number = medium.get("position", 1)
+                for t in medium.get("tracks") or []:
+                    track_title = t.get("title")
+                    length = int(t.get("length", 0) / 1000) if t.get("length") else None
+                    track_number = t.get("position")
+                    if track_title and track_number is not None:
+                        incoming_tracks.append({
+                            "Title": track_title,
+                            "Duration": length,
+                            "TrackNumber": track_number,
+                            "DiscNumber": disc_number
+                        })
 
             if update_release_tracks_if_changed(db, release, incoming_tracks):
                 db.commit()
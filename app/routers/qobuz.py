@@ -5,12 +5,15 @@ import requests
 import re
 import hashlib
 import time
+import threading
+from datetime import datetime, timedelta
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-from ..models import Release, Artist
+from ..models import Release, Artist, Config
 from ..db import SessionLocal
 from ..utils.release_utils import update_release_tracks_if_changed
+from ..utils import http_client
 import logging
 
 router = APIRouter()
@@ -18,6 +21,10 @@ logger = logging.getLogger(__name__)
 
 QOBUZ_BASE_URL = "https://www.qobuz.com/api.json/0.2"
 QOBUZ_PLAY_URL = "https://play.qobuz.com"
+QOBUZ_CREDENTIALS_TTL = timedelta(days=7)
+QOBUZ_CREDENTIAL_KEYS = ("QobuzAppId", "QobuzAppSecret", "QobuzCredentialsExpire")
+
+_credentials_lock = threading.Lock()
 
 def get_db():
     db = SessionLocal()
@@ -26,9 +33,10 @@ def get_db():
     finally:
         db.close()
 
-def get_qobuz_credentials():
+def _scrape_qobuz_credentials():
+    client = http_client.get_client("qobuz")
     try:
-        login_resp = requests.get(f"{QOBUZ_PLAY_URL}/login", timeout=10)
+        login_resp = client.get(f"{QOBUZ_PLAY_URL}/login", cache=False)
         login_resp.raise_for_status()
         login_page_html = login_resp.text
 
@@ -42,7 +50,7 @@ def get_qobuz_credentials():
 
         bundle_url = QOBUZ_PLAY_URL + bundle_url_match.group(1)
 
-        bundle_resp = requests.get(bundle_url, timeout=10)
+        bundle_resp = client.get(bundle_url, cache=False)
         bundle_resp.raise_for_status()
         bundle_js = bundle_resp.text
         
@@ -88,6 +96,75 @@ def get_qobuz_credentials():
         logger.error(f"Unexpected error while fetching Qobuz credentials: {e}")
         return None, None
 
+def _load_stored_credentials(db: Session) -> dict[str, str]:
+    entries = db.query(Config).filter(Config.Key.in_(QOBUZ_CREDENTIAL_KEYS)).all()
+    return {entry.Key: entry.Value for entry in entries}
+
+def _store_credentials(db: Session, app_id: str, secret: str):
+    values = {
+        "QobuzAppId": app_id,
+        "QobuzAppSecret": secret,
+        "QobuzCredentialsExpire": (datetime.now() + QOBUZ_CREDENTIALS_TTL).isoformat(),
+    }
+    entries = {entry.Key: entry for entry in db.query(Config).filter(Config.Key.in_(QOBUZ_CREDENTIAL_KEYS)).all()}
+    for key, value in values.items():
+        if key in entries:
+            entries[key].Value = value
+        else:
+            db.add(Config(Key=key, Value=value))
+    db.commit()
+
+def get_qobuz_credentials(rejected: tuple[str, str] | None = None):
+    # The app id and secret scraped from the web player are stored with an expiry and
+    # reused until then, or until Qobuz rejects them. The lock makes concurrent fetches
+    # wait for one scrape instead of each downloading bundle.js.
+    with _credentials_lock:
+        db = SessionLocal()
+        try:
+            stored = _load_stored_credentials(db)
+            app_id = stored.get("QobuzAppId")
+            secret = stored.get("QobuzAppSecret")
+            try:
+                expired = datetime.fromisoformat(stored.get("QobuzCredentialsExpire", "")) <= datetime.now()
+            except ValueError:
+                expired = True
+            if app_id and secret and not expired and (app_id, secret) != rejected:
+                return app_id, secret
+
+            app_id, secret = _scrape_qobuz_credentials()
+            if app_id and secret:
+                _store_credentials(db, app_id, secret)
+            return app_id, secret
+        finally:
+            db.close()
+
+def _is_credential_error(response) -> bool:
+    if response.status_code not in (400, 401):
+        return False
+    try:
+        message = str(response.json().get("message", "")).lower()
+    except ValueError:
+        return False
+    return "app_id" in message or "request_sig" in message or "signature" in message
+
+def _album_tracks_url(album_id: str, secret: str) -> str:
+    unix_ts = int(time.time())
+    r_sig = f"albumgettrackscatalog_id{album_id}{unix_ts}{secret}"
+    r_sig_hashed = hashlib.md5(r_sig.encode("utf-8")).hexdigest()
+    return f"{QOBUZ_BASE_URL}/album/get?album_id={album_id}&extra=tracks&request_ts={unix_ts}&request_sig={r_sig_hashed}"
+
+def _qobuz_get(client: http_client.ProviderClient, credentials: dict, build_url):
+    response = client.get(build_url(credentials["secret"]), headers={"X-App-Id": credentials["app_id"]})
+    if not _is_credential_error(response):
+        return response
+
+    logger.warning("Qobuz rejected the stored app credentials, fetching new ones.")
+    app_id, secret = get_qobuz_credentials(rejected=(credentials["app_id"], credentials["secret"]))
+    if not app_id or not secret:
+        return response
+    credentials.update(app_id=app_id, secret=secret)
+    return client.get(build_url(secret), headers={"X-App-Id": app_id})
+
 def process_qobuz_fetch(artist_id: int):
     db = next(get_db())
     try:
@@ -101,7 +178,8 @@ def process_qobuz_fetch(artist_id: int):
             logger.error(f"Failed to retrieve dynamic Qobuz credentials for artist {artist_id}.")
             return
             
-        headers = {"X-App-Id": app_id}
+        client = http_client.get_client("qobuz", db)
+        credentials = {"app_id": app_id, "secret": secret}
         
         success_messages = []
         error_messages = []
@@ -110,7 +188,7 @@ def process_qobuz_fetch(artist_id: int):
         
         try:
             artist_url = f"{QOBUZ_BASE_URL}/artist/get?artist_id={artist.QobuzId}"
-            artist_resp = requests.get(artist_url, headers=headers, timeout=10)
+            artist_resp = _qobuz_get(client, credentials, lambda secret: artist_url)
             artist_resp.raise_for_status()
             artist_data = artist_resp.json().get("artist", {})
             image_url = artist_data.get("image", {}).get("large_url")
@@ -127,7 +205,7 @@ def process_qobuz_fetch(artist_id: int):
         albums = []
         url = f"{QOBUZ_BASE_URL}/artist/get?artist_id={artist.QobuzId}&extra=albums"
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = _qobuz_get(client, credentials, lambda secret: url)
             response.raise_for_status()
             data = response.json().get('artist', {}).get('albums', {})
             albums.extend(data.get('items', []))
@@ -163,12 +241,7 @@ def process_qobuz_fetch(artist_id: int):
                     db.flush()
                     logger.info(f"Adding new Qobuz release: {title} (ID: {album_id})")
                 
-                unix_ts = int(time.time())
-                r_sig = f"albumgettrackscatalog_id{album_id}{unix_ts}{secret}"
-                r_sig_hashed = hashlib.md5(r_sig.encode("utf-8")).hexdigest()
-                
-                track_url = f"{QOBUZ_BASE_URL}/album/get?album_id={album_id}&extra=tracks&request_ts={unix_ts}&request_sig={r_sig_hashed}"
-                resp = requests.get(track_url, headers=headers, timeout=10)
+                resp = _qobuz_get(client, credentials, lambda secret: _album_tracks_url(album_id, secret))
                 resp.raise_for_status()
 
                 track_data = resp.json().get("album", {}).get("tracks", {}).get("items", [])
@@ -8,7 +8,8 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from ..db import SessionLocal
-from ..models import Config
+from ..models import Config, ImportedFile, Track, Release, Artist
+from ..utils import importer, worker_pool, naming, transfer, scan_stats, http_client, response_cache
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -54,7 +55,7 @@ def _send_sabnzbd_test_request(ip: str, port: str, api_key: str, ssl: str):
     try:
         url = f"{ssl}://{ip}:{port}/api?mode=version&output=json&apikey={api_key}"
         logger.info(f"SABnzbd connection with following URL:{ssl}://{ip}:{port}/api?mode=version&output=json&apikey=redacted")
-        response = requests.get(url, timeout=5)
+        response = http_client.get_client("sabnzbd").get(url, timeout=5)
         if response.status_code == 200 and "version" in response.json():
             logger.info(f"SABnzbd connected successfully (Version: {response.json()['version']})")
         else:
@@ -66,6 +67,8 @@ def _send_sabnzbd_test_request(ip: str, port: str, api_key: str, ssl: str):
 
 DEEZER_QUALITIES = ["FLAC", "MP3_320", "MP3_256", "MP3_128"]
 SABNZBD_SSL_OPTIONS = ["http", "https"]
+POSITIVE_INTEGER_SETTINGS = ["ImportWorkerCount", "ImportCommitBatchSize"]
+NAMING_PREVIEW_LIMIT = 1000
 
 @router.get("/settings", response_class=HTMLResponse, name="get_settings_page")
 async def get_settings_page(request: Request, db: Session = Depends(get_db)):
@@ -79,7 +82,9 @@ async def get_settings_page(request: Request, db: Session = Depends(get_db)):
         "Import/Library Paths": ["LibraryFolderPath", "ImportFolderPath"],
         "Deezer Settings": ["DeezerARLKey", "DeezerDownloadQuality"],
         "SABnzbd Settings": ["SabnzbdIP", "SabnzbdPort", "SabnzbdAPIKey", "SabnzbdPathMapping", "SabnzbdSSL"],
-        "File Naming": ["FileRenamePattern", "FolderStructurePattern"]
+        "File Naming": ["FileRenamePattern", "FolderStructurePattern"],
+        "Import Performance": ["ImportWorkerMode", "ImportWorkerCount", "ImportCommitBatchSize", "ImportTransferMode", "ImportVerifyCopies", "ImportSlowFileSeconds"],
+        "Provider Requests": ["HttpTimeoutSeconds", "HttpRetries", "ProviderCacheMaxMB"]
     }
 
     grouped_configs = {group: [] for group in grouped_settings_schema.keys()}
@@ -109,6 +114,30 @@ async def get_settings_page(request: Request, db: Session = Depends(get_db)):
                 config_entry["options"] = SABNZBD_SSL_OPTIONS
                 if not value or value not in SABNZBD_SSL_OPTIONS:
                     config_entry["Value"] = "http"
+            elif key == "ImportWorkerMode":
+                config_entry["options"] = worker_pool.WORKER_MODES
+                if not value or value not in worker_pool.WORKER_MODES:
+                    config_entry["Value"] = worker_pool.DEFAULT_WORKER_MODE
+            elif key == "ImportWorkerCount" and not value:
+                config_entry["Value"] = str(worker_pool.DEFAULT_WORKER_COUNT)
+            elif key == "ImportCommitBatchSize" and not value:
+                config_entry["Value"] = str(importer.DEFAULT_COMMIT_BATCH_SIZE)
+            elif key == "ImportTransferMode":
+                config_entry["options"] = transfer.TRANSFER_MODES
+                if not value or value not in transfer.TRANSFER_MODES:
+                    config_entry["Value"] = transfer.DEFAULT_TRANSFER_MODE
+            elif key == "ImportVerifyCopies":
+                config_entry["options"] = transfer.VERIFY_OPTIONS
+                if not value or value not in transfer.VERIFY_OPTIONS:
+                    config_entry["Value"] = "true"
+            elif key == "ImportSlowFileSeconds" and not value:
+                config_entry["Value"] = str(scan_stats.DEFAULT_SLOW_FILE_SECONDS)
+            elif key == "HttpTimeoutSeconds" and not value:
+                config_entry["Value"] = str(http_client.DEFAULT_TIMEOUT_SECONDS)
+            elif key == "HttpRetries" and not value:
+                config_entry["Value"] = str(http_client.DEFAULT_RETRIES)
+            elif key == "ProviderCacheMaxMB" and not value:
+                config_entry["Value"] = str(response_cache.DEFAULT_MAX_MB)
                 
             if key in ["LibraryFolderPath", "ImportFolderPath", "SabnzbdPathMapping"] and config_entry["Value"]:
                 try:
@@ -152,6 +181,35 @@ async def save_setting(
             raise HTTPException(status_code=400, detail=f"Invalid value for DeezerDownloadQuality: {value}")
         if key == "SabnzbdSSL" and value not in SABNZBD_SSL_OPTIONS:
             raise HTTPException(status_code=400, detail=f"Invalid value for SabnzbdSSL: {value}")
+        if key == "ImportWorkerMode" and value not in worker_pool.WORKER_MODES:
+            raise HTTPException(status_code=400, detail=f"Invalid value for ImportWorkerMode: {value}")
+        if key == "ImportTransferMode" and value not in transfer.TRANSFER_MODES:
+            raise HTTPException(status_code=400, detail=f"Invalid value for ImportTransferMode: {value}")
+        if key == "ImportVerifyCopies" and value not in transfer.VERIFY_OPTIONS:
+            raise HTTPException(status_code=400, detail=f"Invalid value for ImportVerifyCopies: {value}")
+        if key in POSITIVE_INTEGER_SETTINGS and (not value.isdigit() or int(value) < 1):
+            raise HTTPException(status_code=400, detail=f"{key} must be a positive whole number: {value}")
+        if key == "ImportSlowFileSeconds":
+            try:
+                if float(value) < 0:
+                    raise ValueError
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"ImportSlowFileSeconds must be a number of seconds: {value}")
+        if key == "HttpTimeoutSeconds":
+            try:
+                if float(value) <= 0:
+                    raise ValueError
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"HttpTimeoutSeconds must be a positive number of seconds: {value}")
+        if key in ["HttpRetries", "ProviderCacheMaxMB"] and not value.isdigit():
+            raise HTTPException(status_code=400, detail=f"{key} must be a whole number: {value}")
+        try:
+            if key == "FolderStructurePattern":
+                naming.validate_folder_pattern(value)
+            elif key == "FileRenamePattern":
+                naming.validate_file_pattern(value)
+        except naming.NamingPatternError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
         config_entry = db.query(Config).filter(Config.Key == key).first()
         if config_entry:
@@ -173,6 +231,71 @@ async def save_setting(
         logger.error(f"Error saving setting {key}: {e}", exc_info=True)
         return RedirectResponse(url=f"{request.url_for('get_settings_page')}?error_message=Failed to save setting {key}: {e}", status_code=303)
 
+@router.get("/settings/naming-preview", response_class=HTMLResponse)
+def naming_preview(
+    request: Request,
+    folder_pattern: str | None = None,
+    file_rename_pattern: str | None = None,
+    db: Session = Depends(get_db)
+):
+    error_message = None
+    previews = []
+    configs = {c.Key: c.Value for c in db.query(Config).all()}
+    if folder_pattern is None:
+        folder_pattern = configs.get("FolderStructurePattern") or ""
+    if file_rename_pattern is None:
+        file_rename_pattern = configs.get("FileRenamePattern") or ""
+    layout = naming.LibraryLayout(configs.get("LibraryFolderPath"), folder_pattern, file_rename_pattern)
+
+    try:
+        naming.validate_folder_pattern(folder_pattern)
+        naming.validate_file_pattern(file_rename_pattern)
+    except naming.NamingPatternError as e:
+        error_message = str(e)
+
+    if not layout.library_folder_path:
+        error_message = error_message or "Library folder path is not set. Please configure it before previewing the layout."
+    else:
+        rows = (
+            db.query(ImportedFile.FileName, Track.Title, Track.TrackNumber, Release.Title, Release.Year, Release.Type, Artist.Name)
+            .join(Track, ImportedFile.TrackId == Track.Id)
+            .join(Release, ImportedFile.ReleaseId == Release.Id)
+            .join(Artist, ImportedFile.ArtistId == Artist.Id)
+            .order_by(ImportedFile.Id.desc())
+            .limit(NAMING_PREVIEW_LIMIT)
+            .all()
+        )
+        items = [
+            {
+                'artist': artist_name,
+                'album': release_title,
+                'title': track_title,
+                'track_number': track_number,
+                'disknumber': None,
+                'release_year': release_year,
+                'release_type': release_type or 'Album',
+                'file_ext': os.path.splitext(file_name)[1],
+            }
+            for file_name, track_title, track_number, release_title, release_year, release_type, artist_name in rows
+        ]
+        target_paths = layout.render_batch(items)
+        previews = [
+            (row[0], os.path.relpath(target_path, layout.library_folder_path))
+            for row, target_path in zip(rows, target_paths)
+        ]
+
+    return templates.TemplateResponse(
+        "naming_preview.html",
+        {
+            "request": request,
+            "folder_pattern": folder_pattern,
+            "file_rename_pattern": file_rename_pattern,
+            "previews": previews,
+            "preview_limit": NAMING_PREVIEW_LIMIT,
+            "error_message": error_message,
+        }
+    )
+
 @router.post("/settings/test-path", response_class=RedirectResponse)
 async def test_general_path(
     request: Request,
@@ -1,14 +1,29 @@
 # app/routers/tasks.py
-from fastapi import APIRouter, Request
+import json
+from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
+from sqlalchemy.orm import Session
+from ..db import SessionLocal
+from ..utils import scan_stats
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 @router.get("/tasks", response_class=HTMLResponse)
-def about_page(request: Request):
+def about_page(request: Request, db: Session = Depends(get_db)):
+    scan_runs = [
+        (run, json.loads(run.StageSeconds) if run.StageSeconds else {})
+        for run in scan_stats.get_recent_runs(db)
+    ]
     return templates.TemplateResponse(
         "tasks.html",
-        {"request": request}
+        {"request": request, "scan_runs": scan_runs, "stages": scan_stats.STAGES}
     )
@@ -0,0 +1,86 @@
+# /app/utils/directory_cache.py
+import os
+import logging
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+COVER_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+class DirectoryEntry(NamedTuple):
+    name: str
+    path: str
+    is_dir: bool
+    stat: os.stat_result | None
+
+class DirectoryCache:
+    # Lives for one scan. Discovery stores the listings it already made, and the album
+    # builder and cover lookup read them instead of listing the directory again. Listings
+    # are released after each batch; cleanup lists the touched directories again.
+    def __init__(self, audio_extensions: tuple[str, ...]):
+        self.audio_extensions = audio_extensions
+        self._listings: dict[str, dict[str, DirectoryEntry]] = {}
+        self.listed_count = 0
+        self.touched_dirs: set[str] = set()
+
+    def store(self, dir_path: str, entries: list[DirectoryEntry]):
+        self._listings[dir_path] = {entry.name: entry for entry in entries}
+
+    def _listing(self, dir_path: str) -> dict[str, DirectoryEntry]:
+        listing = self._listings.get(dir_path)
+        if listing is not None:
+            return listing
+
+        listing = {}
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            listing[entry.name] = DirectoryEntry(entry.name, entry.path, True, None)
+                        elif entry.name.lower().endswith(self.audio_extensions) and entry.is_file():
+                            listing[entry.name] = DirectoryEntry(entry.name, entry.path, False, entry.stat())
+                        else:
+                            listing[entry.name] = DirectoryEntry(entry.name, entry.path, False, None)
+                    except OSError as e:
+                        logger.warning(f"Could not stat {entry.path}: {e}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not list directory {dir_path}: {e}")
+            return {}
+
+        self.listed_count += 1
+        self._listings[dir_path] = listing
+        return listing
+
+    def entries(self, dir_path: str) -> list[DirectoryEntry]:
+        return list(self._listing(dir_path).values())
+
+    def audio_files(self, dir_path: str) -> list[tuple[str, os.stat_result]]:
+        return sorted(
+            (entry.path, entry.stat) for entry in self._listing(dir_path).values()
+            if entry.stat is not None
+        )
+
+    def find_cover(self, dir_path: str) -> str | None:
+        for name in sorted(self._listing(dir_path)):
+            if name.lower().startswith('cover.') and name.lower().endswith(COVER_EXTENSIONS):
+                cover_path = os.path.join(dir_path, name)
+                logger.debug(f"Found local cover art: {cover_path}")
+                return cover_path
+        return None
+
+    def discard(self, path: str):
+        dir_path = os.path.dirname(path)
+        self.touched_dirs.add(dir_path)
+        listing = self._listings.get(dir_path)
+        if listing is not None:
+            listing.pop(os.path.basename(path), None)
+
+    def release(self):
+        self._listings.clear()
+
+    def forget(self, dir_path: str):
+        self._listings.pop(dir_path, None)
+        self.discard(dir_path)
@@ -0,0 +1,134 @@
+# /app/utils/entity_index.py
+import logging
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from ..models import Artist, Release, Track
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_CHUNK_SIZE = 500
+
+def _chunks(values, size: int = LOOKUP_CHUNK_SIZE):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+def _is_usable(entity) -> bool:
+    state = inspect(entity)
+    return not (state.transient or state.detached)
+
+def links(**entities) -> dict:
+    # Persistent rows are linked by primary key so expired objects are never refreshed;
+    # rows created in this batch are linked through the relationship and get their keys at flush.
+    kwargs = {}
+    for name, entity in entities.items():
+        identity = inspect(entity).identity
+        if identity:
+            kwargs[f"{name.capitalize()}Id"] = identity[0]
+        else:
+            kwargs[name] = entity
+    return kwargs
+
+class EntityIndex:
+    def __init__(self, db: Session):
+        self.db = db
+        self._artists: dict[str, Artist | None] = {}
+        self._releases: dict[tuple[str, str], Release | None] = {}
+        self._tracks: dict[tuple[str, str, str], Track | None] = {}
+
+    def preload(self, artist_names: set[str], release_titles: set[str], track_titles: set[str]):
+        new_artist_names = {name for name in artist_names if name and name not in self._artists}
+        for chunk in _chunks(new_artist_names):
+            for artist in self.db.query(Artist).filter(Artist.Name.in_(chunk)).all():
+                self._artists[artist.Name] = artist
+        for name in new_artist_names:
+            self._artists.setdefault(name, None)
+
+        known_artist_names = [name for name in artist_names if self._artists.get(name) is not None]
+        new_release_keys = {(name, title) for name in known_artist_names for title in release_titles if (name, title) not in self._releases}
+        release_keys_by_id = {}
+        if new_release_keys:
+            wanted_titles = {title for _, title in new_release_keys}
+            for name_chunk in _chunks({name for name, _ in new_release_keys}):
+                for title_chunk in _chunks(wanted_titles):
+                    rows = (
+                        self.db.query(Release, Artist.Name)
+                        .join(Artist, Release.ArtistId == Artist.Id)
+                        .filter(Artist.Name.in_(name_chunk), Release.Title.in_(title_chunk))
+                        .order_by(Release.Id)
+                        .all()
+                    )
+                    for release, artist_name in rows:
+                        key = (artist_name, release.Title)
+                        if key in new_release_keys and self._releases.get(key) is None:
+                            self._releases[key] = release
+                            release_keys_by_id[release.Id] = key
+            for key in new_release_keys:
+                self._releases.setdefault(key, None)
+
+        if release_keys_by_id and track_titles:
+            for id_chunk in _chunks(release_keys_by_id):
+                for title_chunk in _chunks(track_titles):
+                    tracks = (
+                        self.db.query(Track)
+                        .filter(Track.ReleaseId.in_(id_chunk), Track.Title.in_(title_chunk))
+                        .order_by(Track.Id)
+                        .all()
+                    )
+                    for track in tracks:
+                        key = (*release_keys_by_id[track.ReleaseId], track.Title)
+                        self._tracks.setdefault(key, track)
+
+        logger.debug(f"Entity index preloaded: {len(self._artists)} artists, {len(self._releases)} releases, {len(self._tracks)} tracks known.")
+
+    def find_artist(self, artist_name: str) -> Artist | None:
+        if artist_name not in self._artists:
+            self._artists[artist_name] = self.db.query(Artist).filter(Artist.Name == artist_name).first()
+        artist = self._artists[artist_name]
+        if artist is not None and not _is_usable(artist):
+            self._artists[artist_name] = artist = None
+        return artist
+
+    def get_or_create_artist(self, artist_name: str) -> Artist:
+        artist = self.find_artist(artist_name)
+        if artist is None:
+            logger.info(f"Artist '{artist_name}' not found, creating new artist.")
+            artist = Artist(Name=artist_name)
+            self.db.add(artist)
+            self._artists[artist_name] = artist
+        return artist
+
+    def get_or_create_release(self, artist: Artist, artist_name: str, release_title: str, release_year: int = None, release_type: str = 'Album') -> Release:
+        key = (artist_name, release_title)
+        if key not in self._releases:
+            identity = inspect(artist).identity
+            self._releases[key] = self.db.query(Release).filter(
+                Release.ArtistId == identity[0],
+                Release.Title == release_title
+            ).first() if identity else None
+
+        release = self._releases[key]
+        if release is None or not _is_usable(release):
+            logger.info(f"Release '{release_title}' for Artist '{artist_name}' not found, creating new release.")
+            release = Release(Title=release_title, Year=release_year, Type=release_type, **links(artist=artist))
+            self.db.add(release)
+            self._releases[key] = release
+        return release
+
+    def get_or_create_track(self, release: Release, artist_name: str, release_title: str, track_title: str, track_number: int = None, duration: int = None) -> Track:
+        key = (artist_name, release_title, track_title)
+        if key not in self._tracks:
+            identity = inspect(release).identity
+            self._tracks[key] = self.db.query(Track).filter(
+                Track.ReleaseId == identity[0],
+                Track.Title == track_title
+            ).first() if identity else None
+
+        track = self._tracks[key]
+        if track is None or not _is_usable(track):
+            logger.info(f"Track '{track_title}' for Release '{release_title}' not found, creating new track.")
+            track = Track(Title=track_title, TrackNumber=track_number, Duration=duration, **links(release=release))
+            self.db.add(track)
+            self._tracks[key] = track
+        return track
@@ -0,0 +1,193 @@
+# /app/utils/http_client.py
+import time
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from sqlalchemy.orm import Session
+
+from ..models import Config
+from . import response_cache
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Releasarr/1.0"
+DEFAULT_TIMEOUT_SECONDS = 10.0
+DEFAULT_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRY_DELAY_SECONDS = 60.0
+# Connections kept open per host, and hosts kept per provider session.
+POOL_MAXSIZE = 16
+POOL_CONNECTIONS = 8
+
+# Static headers per provider. Values that change per user or per fetch, like the
+# Discogs token or the Qobuz app id, are passed with the request.
+PROVIDER_HEADERS = {
+    "musicbrainz": {"User-Agent": USER_AGENT, "Accept": "application/json"},
+    "coverartarchive": {"User-Agent": USER_AGENT, "Accept": "application/json"},
+    "discogs": {"User-Agent": USER_AGENT},
+    "deezer": {},
+    "qobuz": {},
+    "indexer": {},
+    "sabnzbd": {},
+}
+# Requests allowed per window, shared by every fetch in this process.
+PROVIDER_RATE_LIMITS = {
+    "deezer": (50, 5.0),
+    "musicbrainz": (1, 1.0),
+}
+
+class RateLimiter:
+    # Token bucket: bursts up to the full allowance, then one request per refill interval.
+    def __init__(self, requests_allowed: int, seconds: float):
+        self.capacity = float(requests_allowed)
+        self.refill_rate = requests_allowed / seconds
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                time.sleep((1 - self._tokens) / self.refill_rate)
+
+_sessions: dict[tuple[str, int], requests.Session] = {}
+_limiters = {provider: RateLimiter(*limit) for provider, limit in PROVIDER_RATE_LIMITS.items()}
+_lock = threading.Lock()
+
+def _retry_delay(response: requests.Response, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(delay, 0.0), MAX_RETRY_DELAY_SECONDS)
+    return min(RETRY_BACKOFF_SECONDS * 2 ** attempt, MAX_RETRY_DELAY_SECONDS)
+
+class ProviderClient:
+    def __init__(self, provider: str, session: requests.Session, timeout: float, limiter: RateLimiter | None = None, cache_max_bytes: int = 0, retries: int = DEFAULT_RETRIES):
+        self.provider = provider
+        self.session = session
+        self.timeout = timeout
+        self.limiter = limiter
+        self.cache_max_bytes = cache_max_bytes
+        self.retries = retries
+
+    def _send(self, url: str, **kwargs) -> requests.Response:
+        # Failed statuses are retried here rather than in urllib3, so every attempt takes
+        # a rate limiter token and waits out Retry-After. The last response is returned
+        # as is, and callers keep checking status codes themselves.
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                self.limiter.acquire()
+            response = self.session.get(url, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                return response
+            delay = _retry_delay(response, attempt)
+            logger.info(f"{self.provider} returned {response.status_code} for {url}; retrying in {delay:.1f}s ({attempt + 1}/{self.retries}).")
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, cache: bool = True, **kwargs) -> requests.Response:
+        # Cached responses are served without a request until their TTL runs out, then
+        # revalidated with If-None-Match / If-Modified-Since. Hits skip the rate limiter.
+        kwargs.setdefault("timeout", self.timeout)
+        ttl = response_cache.CACHE_TTL_SECONDS.get(self.provider)
+        if not cache or ttl is None or not self.cache_max_bytes or kwargs.get("params"):
+            return self._send(url, **kwargs)
+
+        key = response_cache.cache_key(self.provider, url)
+        cached = response_cache.lookup(key)
+        if cached is not None and cached.expires > time.time():
+            response_cache.touch(cached)
+            return response_cache.to_response(cached, url, "hit")
+        if cached is not None:
+            kwargs["headers"] = {**response_cache.conditional_headers(cached), **(kwargs.get("headers") or {})}
+
+        response = self._send(url, **kwargs)
+        if cached is not None and response.status_code == 304:
+            response_cache.refresh(cached, ttl, response)
+            return response_cache.to_response(cached, url, "revalidated")
+        if response_cache.is_storable(self.provider, response):
+            response_cache.store(self.provider, key, ttl, response, self.cache_max_bytes)
+        return response
+
+def _create_session(provider: str, retries: int) -> requests.Session:
+    # urllib3 only retries connection failures; statuses are retried by ProviderClient.
+    retry = Retry(
+        total=retries,
+        status=0,
+        backoff_factor=RETRY_BACKOFF_SECONDS,
+        allowed_methods=["GET", "HEAD"],
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(PROVIDER_HEADERS.get(provider, {}))
+    return session
+
+def _get_session(provider: str, retries: int) -> requests.Session:
+    with _lock:
+        session = _sessions.get((provider, retries))
+        if session is None:
+            for key in [key for key in _sessions if key[0] == provider]:
+                _sessions.pop(key).close()
+            session = _create_session(provider, retries)
+            _sessions[(provider, retries)] = session
+            logger.debug(f"Opened HTTP session for {provider} ({retries} retries).")
+        return session
+
+def load_settings(db: Session) -> tuple[float, int]:
+    timeout = DEFAULT_TIMEOUT_SECONDS
+    retries = DEFAULT_RETRIES
+    timeout_entry = db.query(Config).filter(Config.Key == "HttpTimeoutSeconds").first()
+    if timeout_entry and timeout_entry.Value:
+        try:
+            timeout = float(timeout_entry.Value)
+            if timeout <= 0:
+                raise ValueError
+        except ValueError:
+            logger.warning(f"Invalid HttpTimeoutSeconds '{timeout_entry.Value}', using {DEFAULT_TIMEOUT_SECONDS}.")
+            timeout = DEFAULT_TIMEOUT_SECONDS
+    retries_entry = db.query(Config).filter(Config.Key == "HttpRetries").first()
+    if retries_entry and retries_entry.Value:
+        try:
+            retries = max(int(retries_entry.Value), 0)
+        except ValueError:
+            logger.warning(f"Invalid HttpRetries '{retries_entry.Value}', using {DEFAULT_RETRIES}.")
+    return timeout, retries
+
+def get_client(provider: str, db: Session | None = None) -> ProviderClient:
+    if db is not None:
+        timeout, retries = load_settings(db)
+        cache_max_bytes = response_cache.load_max_bytes(db)
+    else:
+        timeout, retries = DEFAULT_TIMEOUT_SECONDS, DEFAULT_RETRIES
+        cache_max_bytes = response_cache.DEFAULT_MAX_MB * 1024 * 1024
+    return ProviderClient(provider, _get_session(provider, retries), timeout, _limiters.get(provider), cache_max_bytes, retries)
+
+def shutdown():
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
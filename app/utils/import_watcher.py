@@ -0,0 +1,141 @@
+# /app/utils/import_watcher.py
+import os
+import time
+import logging
+import threading
+from typing import Callable
+
+try:
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    logging.warning("Watchdog library not found. The import folder will be polled instead of watched.")
+    WATCHDOG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SETTLE_SECONDS = 3
+CHECK_INTERVAL_SECONDS = 1
+
+def _snapshot_directory(dir_path: str) -> dict[str, tuple[int, int]] | None:
+    try:
+        with os.scandir(dir_path) as entries:
+            snapshot = {}
+            for entry in entries:
+                if entry.is_file():
+                    st = entry.stat()
+                    snapshot[entry.name] = (st.st_size, st.st_mtime_ns)
+            return snapshot
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Could not snapshot {dir_path} while waiting for it to settle: {e}")
+        return {}
+
+class ImportWatcher:
+    def __init__(self):
+        self.root_path = None
+        self._on_settled = None
+        self._observer = None
+        self._debounce_thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._pending: dict[str, dict] = {}
+
+    def is_watching(self, root_path: str | None) -> bool:
+        return (
+            root_path is not None
+            and self.root_path == root_path
+            and self._observer is not None
+            and self._observer.is_alive()
+        )
+
+    def start(self, root_path: str, on_settled: Callable[[list[str]], None]) -> bool:
+        self.stop()
+        if not WATCHDOG_AVAILABLE or not root_path or not os.path.isdir(root_path):
+            return False
+
+        observer = Observer()
+        try:
+            observer.schedule(self, root_path, recursive=True)
+            observer.start()
+        except Exception as e:
+            logger.warning(f"Could not watch import folder {root_path} ({e}). Falling back to polling.")
+            return False
+
+        self.root_path = root_path
+        self._on_settled = on_settled
+        self._observer = observer
+        self._stop_event.clear()
+        self._debounce_thread = threading.Thread(target=self._debounce_loop, name="import-watcher", daemon=True)
+        self._debounce_thread.start()
+        logger.info(f"Watching import folder for changes: {root_path}")
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+                self._observer.join(timeout=5)
+            except Exception as e:
+                logger.warning(f"Error stopping import folder watcher: {e}")
+        if self._debounce_thread is not None and self._debounce_thread is not threading.current_thread():
+            self._debounce_thread.join(timeout=5)
+        self._observer = None
+        self._debounce_thread = None
+        self.root_path = None
+        with self._lock:
+            self._pending.clear()
+
+    def dispatch(self, event):
+        if event.event_type in ("deleted", "opened", "closed_no_write"):
+            return
+        path = getattr(event, "dest_path", None) or event.src_path
+        if isinstance(path, bytes):
+            path = os.fsdecode(path)
+        dir_path = path if event.is_directory else os.path.dirname(path)
+        root_path = self.root_path
+        if not root_path or (dir_path != root_path and not dir_path.startswith(root_path.rstrip(os.sep) + os.sep)):
+            return
+        with self._lock:
+            entry = self._pending.setdefault(dir_path, {"snapshot": None})
+            entry["last_event"] = time.monotonic()
+
+    def _collect_settled(self) -> list[str]:
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                dir_path for dir_path, entry in self._pending.items()
+                if now - entry["last_event"] >= SETTLE_SECONDS
+            ]
+
+        settled = []
+        for dir_path in candidates:
+            snapshot = _snapshot_directory(dir_path)
+            with self._lock:
+                entry = self._pending.get(dir_path)
+                if entry is None or now - entry["last_event"] < SETTLE_SECONDS:
+                    continue
+                if snapshot is None:
+                    del self._pending[dir_path]
+                elif snapshot != entry["snapshot"]:
+                    entry["snapshot"] = snapshot
+                    entry["last_event"] = now
+                else:
+                    del self._pending[dir_path]
+                    settled.append(dir_path)
+        return settled
+
+    def _debounce_loop(self):
+        while not self._stop_event.wait(CHECK_INTERVAL_SECONDS):
+            settled = self._collect_settled()
+            if not settled:
+                continue
+            logger.info(f"Import watcher: {len(settled)} directories settled, handing them to the importer.")
+            try:
+                self._on_settled(settled)
+            except Exception as e:
+                logger.error(f"Error importing settled directories {settled}: {e}", exc_info=True)
+
+watcher = ImportWatcher()
@@ -2,12 +2,21 @@
 import os
 import logging
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, SessionTransaction
 from sqlalchemy.exc import IntegrityError
-import shutil
 import re
+from collections import Counter, defaultdict
+from itertools import islice
+from typing import Callable, Iterable, Iterator, NamedTuple
 
-from ..models import Config, Artist, Release, Track, ImportedFile, UnmatchedFile
+from ..models import Config, ImportedFile, UnmatchedFile, Artist
+from . import scan_state, scan_stats, worker_pool, metadata_cache, transfer, tag_reader
+from .entity_index import EntityIndex, links
+from .directory_cache import DirectoryCache
+from .naming import LibraryLayout, load_layout
+from .scan_stats import ScanStats
+from .scan_coordinator import coordinator
 
 try:
     from mutagen.mp3 import MP3
@@ -20,10 +29,26 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+AUDIO_EXTENSIONS = ('.mp3', '.flac', '.wav', '.aac', '.ogg', '.m4a')
+IMPORT_BATCH_SIZE = 500
+DISCOVERY_CHUNK_SIZE = 500
+DEFAULT_COMMIT_BATCH_SIZE = 50
+ALBUM_SETTLE_SECONDS = 5
+UNMATCHED_PAGE_SIZE = 100
+UNMATCHED_GROUP_LIMIT = 200
+
 def _get_config_value(db: Session, key: str) -> str | None:
     config_entry = db.query(Config).filter(Config.Key == key).first()
     return config_entry.Value if config_entry else None
 
+def _get_int_config_value(db: Session, key: str, default: int) -> int:
+    value = _get_config_value(db, key)
+    try:
+        return max(1, int(value)) if value else default
+    except ValueError:
+        logger.warning(f"Invalid value '{value}' for {key}, using {default}.")
+        return default
+
 def get_primary_artist_name(artist_name: str) -> str:
     if not artist_name:
         return 'Unknown Artist'
@@ -39,64 +64,24 @@ def get_primary_artist_name(artist_name: str) -> str:
 
     return artist_name
 
-def _get_or_create_artist(db: Session, artist_name: str) -> Artist:
-    artist = db.query(Artist).filter(Artist.Name == artist_name).first()
-    
-    if not artist:
-        logger.info(f"Artist '{artist_name}' not found, creating new artist.")
-        artist = Artist(Name=artist_name)
-        db.add(artist)
-        db.flush()
-        logger.debug(f"Created new artist: {artist.Name} (ID: {artist.Id})")
-    
-    return artist
-
-def _get_or_create_release(db: Session, artist_id: int, release_title: str, release_year: int = None, release_type: str = 'Album') -> Release:
-    release = db.query(Release).filter(
-        Release.ArtistId == artist_id,
-        Release.Title == release_title
-    ).first()
-
-    if not release:
-        logger.info(f"Release '{release_title}' for Artist ID {artist_id} not found, creating new release.")
-        release = Release(
-            ArtistId=artist_id,
-            Title=release_title,
-            Year=release_year,
-            Type=release_type
-        )
-        db.add(release)
-        db.flush()
-        logger.debug(f"Created new release: {release.Title} (ID: {release.Id}) for Artist ID {artist_id}")
-    return release
-
-def _get_or_create_track(db: Session, release_id: int, artist_id: int, track_title: str, track_number: int = None, duration: int = None) -> Track:
-    track = db.query(Track).filter(
-        Track.ReleaseId == release_id,
-        Track.Title == track_title
-    ).first()
-    if not track:
-        logger.info(f"Track '{track_title}' for Release ID {release_id} not found, creating new track.")
-        track = Track(
-            ReleaseId=release_id,
-            Title=track_title,
-            TrackNumber=track_number,
-            Duration=duration
-        )
-        db.add(track)
-        db.flush()
-        logger.debug(f"Created new track: {track.Title} (ID: {track.Id}) for Release ID {release_id}")
-    return track
-
-def sanitize_path_component(name: str) -> str:
-    if not isinstance(name, str):
-        name = str(name)
-    invalid_chars = r'[<>:"/\\|?*\x00-\x1f]'
-    sanitized_name = re.sub(invalid_chars, '', name).strip()
-    sanitized_name = sanitized_name.replace(':', ' - ')
-    sanitized_name = sanitized_name.replace('/', '_')
-    sanitized_name = sanitized_name.replace('\\', '_')
-    return sanitized_name
+def _primary_album_artist_name(album_artist_raw: str) -> str:
+    primary_album_artist = album_artist_raw.split(';')[0].strip() if ';' in album_artist_raw else album_artist_raw
+    primary_album_artist = primary_album_artist.split('/')[0].strip() if '/' in primary_album_artist else primary_album_artist
+    return primary_album_artist
+
+def _preload_entities(entity_index: EntityIndex, metadata_list: list[dict]):
+    artist_names = set()
+    for metadata in metadata_list:
+        if metadata.get('albumartist'):
+            artist_names.add(_primary_album_artist_name(metadata['albumartist']))
+        if metadata.get('artist'):
+            artist_names.add(metadata['artist'])
+            artist_names.add(get_primary_artist_name(metadata['artist']))
+    entity_index.preload(
+        artist_names,
+        {metadata['album'] for metadata in metadata_list},
+        {metadata['title'] for metadata in metadata_list}
+    )
 
 def _extract_metadata(file_path: str) -> dict:
     metadata = {
@@ -116,28 +101,22 @@ def _extract_metadata(file_path: str) -> dict:
 
     file_name = os.path.basename(file_path)
     current_filename_no_ext = os.path.splitext(file_name)[0]
-    source_dir = os.path.dirname(file_path)
-
-    try:
-        for f in os.listdir(source_dir):
-            if f.lower().startswith('cover.') and f.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp')):
-                metadata['cover_path'] = os.path.join(source_dir, f)
-                logger.debug(f"Found local cover art: {metadata['cover_path']}")
-                break
-    except Exception as e:
-        logger.warning(f"Could not scan for cover art in {source_dir}: {e}")
 
     metadata['title'] = current_filename_no_ext
 
     if MUTAGEN_AVAILABLE:
         try:
-            audio = None
-            if file_path.lower().endswith('.mp3'):
-                audio = MP3(file_path)
-            elif file_path.lower().endswith('.flac'):
-                audio = FLAC(file_path)
-            
-            if audio:
+            tag_data = tag_reader.read_tags(file_path)
+            if tag_data is None:
+                audio = None
+                if file_path.lower().endswith('.mp3'):
+                    audio = MP3(file_path)
+                elif file_path.lower().endswith('.flac'):
+                    audio = FLAC(file_path)
+                if audio:
+                    tag_data = tag_reader.TagData(audio, audio.info.length if audio.info else None)
+
+            if tag_data:
                 def get_tag_value(audio_obj, keys):
                     for key in keys:
                         if key in audio_obj:
@@ -147,12 +126,14 @@ def _extract_metadata(file_path: str) -> dict:
                             return str(val).strip()
                     return None
 
-                metadata['artist'] = get_tag_value(audio, ['artist', 'TPE1'])
-                metadata['albumartist'] = get_tag_value(audio, ['albumartist', 'TPE2'])
-                metadata['album'] = get_tag_value(audio, ['album', 'TALB'])
-                metadata['title'] = get_tag_value(audio, ['title', 'TIT2', 'TITLE'])
+                tags = tag_data.tags
+                keys = tag_reader.TAG_KEYS
+                metadata['artist'] = get_tag_value(tags, keys['artist'])
+                metadata['albumartist'] = get_tag_value(tags, keys['albumartist'])
+                metadata['album'] = get_tag_value(tags, keys['album'])
+                metadata['title'] = get_tag_value(tags, keys['title'])
                 
-                track_num_str = get_tag_value(audio, ['tracknumber', 'TRCK', 'TRACKNUMBER'])
+                track_num_str = get_tag_value(tags, keys['tracknumber'])
                 if track_num_str:
                     try:
                         parts = track_num_str.split('/')
@@ -162,22 +143,22 @@ def _extract_metadata(file_path: str) -> dict:
                     except (ValueError, IndexError):
                         pass
                 
-                year_str = get_tag_value(audio, ['date', 'TDRC', 'TYER', 'YEAR'])
+                year_str = get_tag_value(tags, keys['date'])
                 if year_str:
                     try:
                         metadata['year'] = int(year_str.split('-')[0])
                     except (ValueError, IndexError):
                         pass
 
-                disc_num_str = get_tag_value(audio, ['discnumber', 'TPOS'])
+                disc_num_str = get_tag_value(tags, keys['discnumber'])
                 if disc_num_str:
                     try:
                         metadata['disknumber'] = int(disc_num_str.split('/')[0])
                     except (ValueError, IndexError):
                         pass
 
-                if audio.info and audio.info.length:
-                    metadata['duration'] = int(audio.info.length)
+                if tag_data.length:
+                    metadata['duration'] = int(tag_data.length)
 
         except ID3NoHeaderError:
             logging.warning(f"No ID3 header found for MP3 file: {file_path}")
@@ -249,322 +230,744 @@ def _extract_metadata(file_path: str) -> dict:
 
     return metadata
 
-def get_unmatched_files(db: Session) -> list[UnmatchedFile]:
-    return db.query(UnmatchedFile).filter(UnmatchedFile.Ignored == False).all()
+def _read_embedded_cover(file_path: str) -> tuple[bytes, str] | None:
+    if not MUTAGEN_AVAILABLE:
+        return None
+    try:
+        if file_path.lower().endswith('.flac'):
+            pictures = FLAC(file_path).pictures
+            if pictures:
+                return pictures[0].data, pictures[0].mime
+        elif file_path.lower().endswith('.mp3'):
+            audio = MP3(file_path)
+            frames = audio.tags.getall('APIC') if audio.tags else []
+            if frames:
+                return frames[0].data, frames[0].mime
+    except Exception as e:
+        logger.warning(f"Could not read embedded cover art from {file_path}: {e}")
+    return None
 
-def _clean_import_directory(import_folder_path: str):
-    logger.info(f"Starting cleanup of import directory: {import_folder_path}")
-    if not os.path.isdir(import_folder_path):
-        logger.warning(f"Import directory '{import_folder_path}' does not exist for cleanup.")
+def _write_embedded_cover(album_model: dict, audio_path: str, target_album_dir: str):
+    # Only tried when the album directory has no cover file, and read at most once per album.
+    if 'embedded_cover' not in album_model:
+        album_model['embedded_cover'] = _read_embedded_cover(audio_path)
+    embedded_cover = album_model['embedded_cover']
+    if not embedded_cover:
         return
 
-    for dirpath, dirnames, filenames in os.walk(import_folder_path, topdown=False):
-        try:
-            if not os.listdir(dirpath) and dirpath != import_folder_path:
+    data, mime = embedded_cover
+    extension = '.png' if mime == 'image/png' else '.jpg'
+    target_cover_path = os.path.join(target_album_dir, f"cover{extension}")
+    if os.path.exists(target_cover_path):
+        return
+    try:
+        with open(target_cover_path, 'wb') as cover_file:
+            cover_file.write(data)
+        logger.info(f"Wrote embedded cover art from '{audio_path}' to '{target_cover_path}'")
+        return target_cover_path
+    except OSError as e:
+        logger.error(f"Failed to write embedded cover art to {target_cover_path}: {e}")
+
+def _assemble_album_model(dir_path: str, audio_paths: list[str], metadata_by_path: dict[str, dict], cover_path: str | None) -> dict:
+    album_model = {
+        'directory': dir_path,
+        'cover_path': cover_path,
+        'tracks': {},
+        'album_counts': Counter(),
+        'album_years': {},
+    }
+
+    years_by_album = defaultdict(Counter)
+    for audio_path in audio_paths:
+        metadata = metadata_by_path[audio_path]
+        metadata['cover_path'] = album_model['cover_path']
+        album_model['tracks'][audio_path] = metadata
+
+        album_key = metadata['album'].strip().lower()
+        album_model['album_counts'][album_key] += 1
+        if metadata['year']:
+            years_by_album[album_key][metadata['year']] += 1
+
+    album_model['album_years'] = {key: years.most_common(1)[0][0] for key, years in years_by_album.items()}
+    logger.debug(f"Built album model for {dir_path}: {len(audio_paths)} tracks, albums: {dict(album_model['album_counts'])}")
+    return album_model
+
+def _build_album_models(db: Session, dir_paths: list[str], worker_mode: str = worker_pool.DEFAULT_WORKER_MODE, worker_count: int = 1, directory_cache: DirectoryCache | None = None, stats: ScanStats | None = None) -> dict[str, dict]:
+    if directory_cache is None:
+        directory_cache = DirectoryCache(AUDIO_EXTENSIONS)
+    if stats is None:
+        stats = ScanStats()
+    with stats.stage("walk"):
+        audio_files_by_dir = {dir_path: directory_cache.audio_files(dir_path) for dir_path in dir_paths}
+    file_stats = {path: st for audio_files in audio_files_by_dir.values() for path, st in audio_files}
+
+    with stats.stage("db_resolve"):
+        metadata_by_path, stale_entries = metadata_cache.load_cached_metadata(db, file_stats)
+    paths_to_extract = [path for path in file_stats if path not in metadata_by_path]
+
+    with stats.stage("tag_parse"):
+        extracted = worker_pool.map_in_pool(_extract_metadata, paths_to_extract, worker_mode, worker_count)
+    with stats.stage("db_resolve"):
+        for path, metadata in zip(paths_to_extract, extracted):
+            metadata_cache.store_metadata(db, path, file_stats[path], metadata, stale_entries.get(path))
+            metadata_by_path[path] = metadata
+    if paths_to_extract:
+        # Flushed rather than committed: the caller may hold catalogue rows whose files
+        # are only transferred once its own batch commit succeeds.
+        with stats.stage("db_resolve"):
+            db.flush()
+    logger.debug(f"Album models for {len(dir_paths)} directories: {len(file_stats) - len(paths_to_extract)} cached, {len(paths_to_extract)} extracted.")
+
+    return {
+        dir_path: _assemble_album_model(dir_path, [path for path, _ in audio_files], metadata_by_path, directory_cache.find_cover(dir_path))
+        for dir_path, audio_files in audio_files_by_dir.items()
+    }
+
+def _build_album_model(db: Session, dir_path: str, directory_cache: DirectoryCache | None = None, stats: ScanStats | None = None) -> dict:
+    return _build_album_models(db, [dir_path], directory_cache=directory_cache, stats=stats)[dir_path]
+
+def _iter_chunks(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def _iter_unknown_files(db: Session, discovered_files: Iterable[tuple[str, str, os.stat_result]], stats: ScanStats | None = None) -> Iterator[tuple[str, str, os.stat_result]]:
+    if stats is None:
+        stats = ScanStats()
+    for chunk in _iter_chunks(discovered_files, DISCOVERY_CHUNK_SIZE):
+        chunk_paths = [file_path for file_path, _, _ in chunk]
+        unknown_files = []
+        with stats.stage("db_resolve"):
+            unmatched_paths = {
+                file_path for (file_path,) in db.query(UnmatchedFile.FilePath)
+                .filter(UnmatchedFile.FilePath.in_(chunk_paths), UnmatchedFile.Ignored == False)
+            }
+            imported_paths = {
+                file_path for (file_path,) in db.query(ImportedFile.FilePath)
+                .filter(ImportedFile.FilePath.in_(chunk_paths))
+            }
+            for file_path, file_name, file_stat in chunk:
+                if file_path in unmatched_paths:
+                    logger.debug(f"File already in unmatched list: {file_path}")
+                    scan_state.record_file_state(db, file_path, file_stat)
+                elif file_path in imported_paths:
+                    logger.debug(f"File already imported: {file_path}")
+                    scan_state.record_file_state(db, file_path, file_stat)
+                else:
+                    unknown_files.append((file_path, file_name, file_stat))
+        yield from unknown_files
+
+def _iter_directory_batches(files: Iterable[tuple[str, str, os.stat_result]], batch_size: int) -> Iterator[dict[str, list]]:
+    # Discovery yields each directory's files together, so a batch is only cut where the
+    # directory changes and every album model sees all of its new files.
+    batch = defaultdict(list)
+    batch_file_count = 0
+    current_dir = None
+    for file_path, file_name, file_stat in files:
+        dir_path = os.path.dirname(file_path)
+        if dir_path != current_dir and batch_file_count >= batch_size:
+            yield batch
+            batch = defaultdict(list)
+            batch_file_count = 0
+        current_dir = dir_path
+        batch[dir_path].append((file_path, file_name, file_stat))
+        batch_file_count += 1
+    if batch:
+        yield batch
+
+def _get_track_metadata(album_model: dict, file_path: str) -> dict:
+    metadata = album_model['tracks'].get(file_path)
+    if metadata is None:
+        metadata = _extract_metadata(file_path)
+        metadata['cover_path'] = album_model['cover_path']
+        album_model['tracks'][file_path] = metadata
+    return metadata
+
+def _classify_release(metadata: dict, album_model: dict) -> tuple[str, int | None]:
+    album_key = metadata['album'].strip().lower()
+    is_album_with_multiple_tracks = album_key != 'unknown album' and album_model['album_counts'][album_key] > 1
+    release_type = 'Single' if metadata['is_single'] and not is_album_with_multiple_tracks else 'Album'
+    release_year = album_model['album_years'].get(album_key, metadata['year'])
+    return release_type, release_year
+
+class UnmatchedPage(NamedTuple):
+    files: list[UnmatchedFile]
+    next_after: str | None
+    previous_before: str | None
+
+def _unmatched_directory_column():
+    # FilePath is always the parent directory, a separator and FileName.
+    return func.substr(UnmatchedFile.FilePath, 1, func.length(UnmatchedFile.FilePath) - func.length(UnmatchedFile.FileName) - 1)
+
+def _filter_unmatched_directory(query, directory: str):
+    # The FilePath range uses its index; the directory column keeps out files in subdirectories.
+    prefix = directory.rstrip(os.sep) + os.sep
+    return query.filter(
+        UnmatchedFile.FilePath >= prefix,
+        UnmatchedFile.FilePath < prefix[:-1] + chr(ord(os.sep) + 1),
+        _unmatched_directory_column() == prefix[:-1]
+    )
+
+def count_unmatched_files(db: Session) -> int:
+    return db.query(func.count(UnmatchedFile.Id)).filter(UnmatchedFile.Ignored == False).scalar()
+
+def get_unmatched_groups(db: Session, after: str | None = None, limit: int = UNMATCHED_GROUP_LIMIT) -> list[tuple[str, int]]:
+    directory = _unmatched_directory_column().label("directory")
+    query = db.query(directory, func.count(UnmatchedFile.Id)).filter(UnmatchedFile.Ignored == False)
+    if after is not None:
+        query = query.filter(_unmatched_directory_column() > after)
+    return (
+        query
+        .group_by(directory)
+        .order_by(directory)
+        .limit(limit)
+        .all()
+    )
+
+def get_unmatched_page(db: Session, directory: str | None = None, after: str | None = None, before: str | None = None, page_size: int = UNMATCHED_PAGE_SIZE) -> UnmatchedPage:
+    # Keyset pagination on the unique, indexed FilePath, so deep pages cost the same as the first.
+    query = db.query(UnmatchedFile).filter(UnmatchedFile.Ignored == False)
+    if directory:
+        query = _filter_unmatched_directory(query, directory)
+
+    if before is not None:
+        rows = query.filter(UnmatchedFile.FilePath < before).order_by(UnmatchedFile.FilePath.desc()).limit(page_size + 1).all()
+        files = list(reversed(rows[:page_size]))
+        previous_before = files[0].FilePath if len(rows) > page_size else None
+        return UnmatchedPage(files, files[-1].FilePath if files else None, previous_before)
+
+    if after is not None:
+        query = query.filter(UnmatchedFile.FilePath > after)
+    rows = query.order_by(UnmatchedFile.FilePath).limit(page_size + 1).all()
+    files = rows[:page_size]
+    next_after = files[-1].FilePath if len(rows) > page_size else None
+    previous_before = files[0].FilePath if after is not None and files else None
+    return UnmatchedPage(files, next_after, previous_before)
+
+def _clean_import_directory(import_folder_path: str, directory_cache: DirectoryCache):
+    # Only directories that lost files during this run are checked, together with
+    # any parents that become empty once they are removed.
+    if not directory_cache.touched_dirs:
+        return
+    root_prefix = import_folder_path.rstrip(os.sep) + os.sep
+    removed_count = 0
+    for dirpath in sorted(directory_cache.touched_dirs, key=lambda path: path.count(os.sep), reverse=True):
+        while dirpath.startswith(root_prefix) and not directory_cache.entries(dirpath):
+            try:
                 os.rmdir(dirpath)
-                logger.info(f"Removed empty directory: {dirpath}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Error removing directory {dirpath}: {e}")
+                break
+            directory_cache.forget(dirpath)
+            removed_count += 1
+            logger.info(f"Removed empty directory: {dirpath}")
+            dirpath = os.path.dirname(dirpath)
+    directory_cache.touched_dirs.clear()
+    logger.info(f"Finished cleanup of import directory: {import_folder_path} ({removed_count} emptied directories removed)")
+
+def _flush_or_commit(db: Session, savepoint: SessionTransaction | None):
+    if savepoint is None:
+        db.commit()
+    else:
+        db.flush()
+
+def _rollback(db: Session, savepoint: SessionTransaction | None):
+    # A failed flush deactivates the savepoint without closing it; it still has to be
+    # rolled back before the session can be used again.
+    if savepoint is None:
+        db.rollback()
+    elif db.get_nested_transaction() is savepoint:
+        savepoint.rollback()
+
+def _load_transfer_session(db: Session) -> transfer.TransferSession:
+    return transfer.TransferSession(
+        _get_config_value(db, "ImportTransferMode") or transfer.DEFAULT_TRANSFER_MODE,
+        verify=_get_config_value(db, "ImportVerifyCopies") != "false"
+    )
+
+def _undo_moves(moved_files: list[tuple[str, str]], transfer_session: transfer.TransferSession | None = None):
+    for source_path, target_path in reversed(moved_files):
+        try:
+            if transfer_session is not None:
+                transfer_session.undo(source_path, target_path)
+            else:
+                transfer.undo(source_path, target_path)
+        except Exception as e:
+            logger.error(f"Could not move '{target_path}' back to '{source_path}': {e}")
+
+def _commit_import_batch(db: Session, pending_transfers: list["PendingTransfer"], transfer_session: transfer.TransferSession, directory_cache: DirectoryCache | None, stats: ScanStats) -> int:
+    # Catalogue rows are committed before their files are transferred, so the write lock
+    # is never held across copies. Returns how many files ended up in the library.
+    transfers = list(pending_transfers)
+    pending_transfers.clear()
+    try:
+        with stats.stage("commit"):
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to commit import batch: {e}. Leaving {sum(len(pending.files) for pending in transfers)} files in the import folder.", exc_info=True)
+        return 0
+    return _transfer_pending(db, transfers, transfer_session, directory_cache, stats)
+
+def _resolve_artist(entity_index: EntityIndex, metadata: dict) -> tuple[Artist, str]:
+    full_artist_name = metadata['artist']
+    if metadata.get('albumartist'):
+        primary_album_artist = _primary_album_artist_name(metadata['albumartist'])
+        artist_db_entry = entity_index.find_artist(primary_album_artist)
+        if artist_db_entry:
+            logger.debug(f"Found existing artist in DB using album artist: {primary_album_artist}")
+            return artist_db_entry, primary_album_artist
+
+    if full_artist_name and full_artist_name != 'Unknown Artist':
+        primary_contributing_artist = get_primary_artist_name(full_artist_name)
+        artist_db_entry = entity_index.find_artist(primary_contributing_artist)
+        if artist_db_entry:
+            logger.debug(f"Found existing artist in DB using contributing artist fallback: {primary_contributing_artist}")
+            return artist_db_entry, primary_contributing_artist
+
+    return entity_index.get_or_create_artist(full_artist_name), full_artist_name
+
+def _transfer_file(file_path: str, target_file_path: str, transfer_session: transfer.TransferSession, moved_files: list[tuple[str, str]] | None, directory_cache: DirectoryCache | None) -> bool:
+    os.makedirs(os.path.dirname(target_file_path), exist_ok=True)
+
+    if os.path.exists(target_file_path):
+        logger.warning(f"Target file already exists, skipping move to avoid overwrite: {target_file_path}. DB entry exists.")
+        return False
+
+    source_kept = transfer_session.transfer(file_path, target_file_path)
+    if moved_files is not None:
+        moved_files.append((file_path, target_file_path))
+    if directory_cache is not None and not source_kept:
+        directory_cache.discard(file_path)
+    logger.info(f"Successfully transferred file ({transfer_session.mode}) from '{file_path}' to '{target_file_path}'")
+    return True
+
+def _transfer_cover(album_model: dict, metadata: dict, target_album_dir: str, target_file_path: str, transfer_session: transfer.TransferSession, moved_files: list[tuple[str, str]] | None, directory_cache: DirectoryCache | None):
+    if not metadata.get('cover_path'):
+        return _write_embedded_cover(album_model, target_file_path, target_album_dir)
+
+    source_cover_path = metadata['cover_path']
+    if not os.path.exists(source_cover_path):
+        return
+    target_cover_path = os.path.join(target_album_dir, os.path.basename(source_cover_path))
+    if os.path.exists(target_cover_path):
+        logger.debug(f"Cover art already exists at {target_cover_path}, skipping move.")
+        return
+    try:
+        cover_kept = transfer_session.transfer(source_cover_path, target_cover_path)
+        if moved_files is not None:
+            moved_files.append((source_cover_path, target_cover_path))
+        if directory_cache is not None and not cover_kept:
+            directory_cache.discard(source_cover_path)
+        logger.info(f"Successfully moved cover from '{source_cover_path}' to '{target_cover_path}'")
+    except Exception as e:
+        logger.error(f"Failed to move cover file {source_cover_path}: {e}")
+
+class PendingTransfer(NamedTuple):
+    album_model: dict
+    target_album_dir: str
+    files: list[tuple[str, str, dict]]
+
+def _release_failed_imports(db: Session, failed_files: list[tuple[str, str, dict]], stats: ScanStats):
+    # Their catalogue rows are already committed, so they are removed again and the
+    # files that are still in the import folder go back to the unmatched list.
+    with stats.stage("db_resolve"):
+        for chunk in _iter_chunks([file_path for file_path, _, _ in failed_files], DISCOVERY_CHUNK_SIZE):
+            db.query(ImportedFile).filter(ImportedFile.FilePath.in_(chunk)).delete(synchronize_session=False)
+        for file_path, _, metadata in failed_files:
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                logger.warning(f"File {file_path} is no longer in the import folder; removed its catalogue entry.")
+                continue
+            _add_unmatched_file(db, file_path, os.path.basename(file_path), file_stat, metadata)
+    try:
+        with stats.stage("commit"):
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Could not remove catalogue entries of {len(failed_files)} files that failed to transfer: {e}", exc_info=True)
+
+def _missing_dirs(dir_paths: set[str]) -> list[str]:
+    # Deepest first, so they can be removed in order.
+    missing = set()
+    for dir_path in dir_paths:
+        while dir_path not in missing and not os.path.isdir(dir_path):
+            missing.add(dir_path)
+            dir_path = os.path.dirname(dir_path)
+    return sorted(missing, key=len, reverse=True)
+
+def _remove_created_dirs(created_dirs: list[str], written_cover: str | None):
+    if written_cover:
+        try:
+            os.remove(written_cover)
         except OSError as e:
-            logger.error(f"Error removing directory {dirpath}: {e}")
-    logger.info(f"Finished cleanup of import directory: {import_folder_path}")
+            logger.error(f"Could not remove cover '{written_cover}' of a failed transfer: {e}")
+    for dir_path in created_dirs:
+        try:
+            os.rmdir(dir_path)
+            logger.info(f"Removed directory '{dir_path}' left by a failed transfer")
+        except OSError:
+            pass
+
+def _transfer_pending(db: Session, pending_transfers: list[PendingTransfer], transfer_session: transfer.TransferSession, directory_cache: DirectoryCache | None, stats: ScanStats) -> int:
+    # Each entry succeeds or fails as a whole: an album unit moves back every track
+    # when one of them fails.
+    transferred_count = 0
+    failed_files = []
+    with stats.stage("move"):
+        for pending in pending_transfers:
+            unit_moves = []
+            cover_done = False
+            written_cover = None
+            created_dirs = _missing_dirs({os.path.dirname(target_file_path) for _, target_file_path, _ in pending.files})
+            try:
+                for file_path, target_file_path, metadata in pending.files:
+                    if _transfer_file(file_path, target_file_path, transfer_session, unit_moves, directory_cache) and not cover_done:
+                        written_cover = _transfer_cover(pending.album_model, metadata, pending.target_album_dir, target_file_path, transfer_session, unit_moves, directory_cache)
+                        cover_done = True
+                transferred_count += len(pending.files)
+            except Exception as e:
+                logger.error(f"Error transferring {len(pending.files)} files to '{pending.target_album_dir}': {e}. Keeping them as unmatched.", exc_info=True)
+                _undo_moves(unit_moves, transfer_session)
+                _remove_created_dirs(created_dirs, written_cover)
+                failed_files.extend(pending.files)
+        transfer_session.finish()
+    if failed_files:
+        _release_failed_imports(db, failed_files, stats)
+    return transferred_count
 
-def _import_file_logic(db: Session, file_path: str, file_name: str, file_size: int, unmatched_file_id: int = None) -> bool:
-    library_folder_path = _get_config_value(db, "LibraryFolderPath")
+def _import_file_logic(db: Session, file_path: str, file_name: str, file_size: int, unmatched_file_id: int = None, album_model: dict = None, entity_index: EntityIndex = None, savepoint: SessionTransaction = None, pending_transfers: list[PendingTransfer] = None, directory_cache: DirectoryCache = None, layout: LibraryLayout = None, transfer_session: transfer.TransferSession = None, stats: ScanStats = None) -> bool:
+    # With a savepoint the file's transfer is queued on pending_transfers and runs once
+    # the caller commits; on its own the file is committed and transferred right away.
+    if layout is None:
+        layout = load_layout(db)
+    if stats is None:
+        stats = ScanStats()
+    if transfer_session is None:
+        transfer_session = _load_transfer_session(db)
+    library_folder_path = layout.library_folder_path
     if not library_folder_path or not os.path.isdir(library_folder_path):
         logger.error(f"Cannot import file {file_name}: Library folder path not configured or does not exist: {library_folder_path}")
         if unmatched_file_id:
             unmatched_file = db.query(UnmatchedFile).filter(UnmatchedFile.Id == unmatched_file_id).first()
             if unmatched_file:
                 unmatched_file.Ignored = True
-                db.commit()
+                _flush_or_commit(db, savepoint)
                 logger.warning(f"Marked unmatched file {file_name} as ignored due to missing library path.")
         return False
 
     try:
-        metadata = _extract_metadata(file_path)
-        
-        is_album_with_multiple_tracks = False
-        import_folder = os.path.dirname(file_path)
-        if metadata.get('album'):
-            album_name_to_check = metadata['album'].strip().lower()
-            if album_name_to_check != 'unknown album':
-                for root, _, files in os.walk(import_folder):
-                    for f in files:
-                        if f.lower().endswith(('.mp3', '.flac', '.wav', '.aac', '.ogg', '.m4a')):
-                            other_file_path = os.path.join(root, f)
-                            if other_file_path == file_path:
-                                continue
-                            
-                            other_metadata = _extract_metadata(other_file_path)
-                            if other_metadata.get('album', '').strip().lower() == album_name_to_check:
-                                is_album_with_multiple_tracks = True
-                                break
-                    if is_album_with_multiple_tracks:
-                        break
-
-        release_type = 'Single' if metadata['is_single'] and not is_album_with_multiple_tracks else 'Album'
+        if album_model is None:
+            album_model = _build_album_model(db, os.path.dirname(file_path), directory_cache, stats)
+        with stats.stage("tag_parse"):
+            metadata = _get_track_metadata(album_model, file_path)
+        release_type, release_year = _classify_release(metadata, album_model)
         
         full_artist_name = metadata['artist']
         album_title = metadata['album']
         track_title = metadata['title']
         track_number = metadata['track_number']
         is_single = (release_type == 'Single')
-        release_year = metadata['year']
         disknumber = metadata['disknumber']
         
         if full_artist_name == 'Unknown Artist' and album_title == 'Unknown Album' and track_title == os.path.splitext(file_name)[0]:
             logger.warning(f"Skipping import for {file_name} due to generic metadata after all fallbacks. It will remain in unmatched.")
             return False
             
-        folder_artist_name = 'Unknown Artist'
-        artist_db_entry = None
-        
-        if metadata.get('albumartist'):
-            album_artist_raw = metadata['albumartist']
-            primary_album_artist = album_artist_raw.split(';')[0].strip() if ';' in album_artist_raw else album_artist_raw
-            primary_album_artist = primary_album_artist.split('/')[0].strip() if '/' in primary_album_artist else primary_album_artist
-            
-            artist_db_entry = db.query(Artist).filter(Artist.Name == primary_album_artist).first()
-            if artist_db_entry:
-                folder_artist_name = artist_db_entry.Name
-                logger.debug(f"Found existing artist in DB using album artist: {folder_artist_name}")
-
-        if not artist_db_entry and full_artist_name and full_artist_name != 'Unknown Artist':
-            primary_contributing_artist = get_primary_artist_name(full_artist_name)
-            artist_db_entry = db.query(Artist).filter(Artist.Name == primary_contributing_artist).first()
-            if artist_db_entry:
-                folder_artist_name = artist_db_entry.Name
-                logger.debug(f"Found existing artist in DB using contributing artist fallback: {folder_artist_name}")
-
-        if not artist_db_entry:
-            artist_db_entry = _get_or_create_artist(db, full_artist_name)
-            folder_artist_name = full_artist_name
-
-        release = _get_or_create_release(db, artist_db_entry.Id, album_title, release_year, release_type)
-        track = _get_or_create_track(db, release.Id, artist_db_entry.Id, track_title, track_number, metadata['duration'])
-
-        new_imported_file = ImportedFile(
-            FilePath=file_path,
-            FileName=file_name,
-            FileSize=file_size,
-            ImportTimestamp=datetime.now().isoformat(),
-            TrackId=track.Id,
-            ReleaseId=release.Id,
-            ArtistId=artist_db_entry.Id
-        )
-        db.add(new_imported_file)
+        if entity_index is None:
+            entity_index = EntityIndex(db)
+            _preload_entities(entity_index, [metadata])
 
-        if unmatched_file_id:
-            unmatched_file = db.query(UnmatchedFile).filter(UnmatchedFile.Id == unmatched_file_id).first()
-            if unmatched_file:
-                db.delete(unmatched_file)
-                logger.debug(f"Deleted unmatched file entry with ID {unmatched_file_id}.")
+        with stats.stage("db_resolve"):
+            artist_db_entry, folder_artist_name = _resolve_artist(entity_index, metadata)
+            release = entity_index.get_or_create_release(artist_db_entry, folder_artist_name, album_title, release_year, release_type)
+            track = entity_index.get_or_create_track(release, folder_artist_name, album_title, track_title, track_number, metadata['duration'])
 
-        db.commit()
-        logger.info(f"Successfully cataloged in DB: {file_name} (Artist: {artist_db_entry.Name}, Album: {release.Title}, Track: {track.Title})")
+            new_imported_file = ImportedFile(
+                FilePath=file_path,
+                FileName=file_name,
+                FileSize=file_size,
+                ImportTimestamp=datetime.now().isoformat(),
+                **links(track=track, release=release, artist=artist_db_entry)
+            )
+            db.add(new_imported_file)
+            metadata_cache.forget(db, file_path)
 
-        file_ext = os.path.splitext(file_name)[1]
-        
-        sanitized_folder_artist_name = sanitize_path_component(folder_artist_name)
-        sanitized_album_title = sanitize_path_component(release.Title)
-        sanitized_track_title = sanitize_path_component(track.Title)
-        sanitized_release_year = sanitize_path_component(str(release_year) if release_year else 'Unknown Year')
-        sanitized_release_type = sanitize_path_component(release_type)
+            if unmatched_file_id:
+                unmatched_file = db.query(UnmatchedFile).filter(UnmatchedFile.Id == unmatched_file_id).first()
+                if unmatched_file:
+                    db.delete(unmatched_file)
+                    logger.debug(f"Deleted unmatched file entry with ID {unmatched_file_id}.")
 
-        folder_pattern = _get_config_value(db, "FolderStructurePattern")
-        
-        target_album_dir = None
-        if not folder_pattern:
-            if release_type == 'Single':
-                target_album_dir = os.path.join(library_folder_path, sanitized_folder_artist_name, "Singles", sanitized_album_title)
-            else:
-                target_album_dir = os.path.join(library_folder_path, sanitized_folder_artist_name, sanitized_album_title)
-            logger.debug(f"No FolderStructurePattern configured. Using default: {target_album_dir}")
-        else:
-            try:
-                format_args = {
-                    'artist': sanitized_folder_artist_name,
-                    'year': sanitized_release_year,
-                    'type': sanitized_release_type,
-                    'album': sanitized_album_title
-                }
-                relative_album_dir = folder_pattern.format(**format_args)
-                path_parts = relative_album_dir.split('/')
-                sanitized_parts = [sanitize_path_component(part) for part in path_parts]
-                target_album_dir = os.path.join(library_folder_path, *sanitized_parts)
-
-                logger.debug(f"Using FolderStructurePattern: {folder_pattern} -> {target_album_dir}")
-            except KeyError as e:
-                logger.warning(f"Invalid placeholder '{e}' in FolderStructurePattern '{folder_pattern}'. Falling back to default pattern for this file.")
-                if release_type == 'Single':
-                    target_album_dir = os.path.join(library_folder_path, sanitized_folder_artist_name, "Singles", sanitized_album_title)
-                else:
-                    target_album_dir = os.path.join(library_folder_path, sanitized_folder_artist_name, sanitized_album_title)
-        
-        file_rename_pattern = _get_config_value(db, "FileRenamePattern")
-
-        formatted_disknumber = ""
-        formatted_tracknumber = ""
-
-        if disknumber is not None and disknumber > 1:
-            formatted_disknumber = f"{disknumber:01d} "
-
-        if track_number is not None:
-            formatted_tracknumber = f"{track_number:02d} "
-        
-        placeholder_values = {
-            'artist': sanitized_folder_artist_name,
-            'title': sanitized_track_title,
-            'album': sanitized_album_title,
-            'disknumber': formatted_disknumber,
-            'tracknumber': formatted_tracknumber,
-        }
-
-        new_file_name_base = None
-        if not file_rename_pattern:
-            if is_single:
-                new_file_name_base = f"{sanitized_folder_artist_name} - {sanitized_track_title}"
-                if sanitized_album_title and sanitized_album_title.lower() not in sanitized_track_title.lower() and sanitized_album_title != 'Unknown Album':
-                        new_file_name_base = f"{sanitized_folder_artist_name} - {sanitized_track_title} ({sanitized_album_title})"
-            else:
-                if track_number is not None:
-                    new_file_name_base = f"{track_number:02d} - {sanitized_track_title}"
-                else:
-                    new_file_name_base = f"{sanitized_track_title}"
-            logger.debug(f"No FileRenamePattern configured. Using default: {new_file_name_base}")
-        else:
-            try:
-                temp_filename_base = file_rename_pattern
-                for key, value in placeholder_values.items():
-                    temp_filename_base = temp_filename_base.replace(f"{{{key}}}", value)
-                
-                new_file_name_base = re.sub(r'\s+', ' ', temp_filename_base).strip()
-                new_file_name_base = re.sub(r'\s*-\s*', ' - ', new_file_name_base).strip(' -')
-
-                logger.debug(f"Using FileRenamePattern: '{file_rename_pattern}' -> '{new_file_name_base}'")
-            except Exception as e:
-                logger.warning(f"Error applying FileRenamePattern '{file_rename_pattern}': {e}. Falling back to default filename pattern.", exc_info=True)
-                if is_single:
-                    new_file_name_base = f"{sanitized_folder_artist_name} - {sanitized_track_title}"
-                    if sanitized_album_title and sanitized_album_title.lower() not in sanitized_track_title.lower() and sanitized_album_title != 'Unknown Album':
-                            new_file_name_base = f"{sanitized_folder_artist_name} - {sanitized_track_title} ({sanitized_album_title})"
-                else:
-                    if track_number is not None:
-                        new_file_name_base = f"{track_number:02d} - {sanitized_track_title}"
-                    else:
-                        new_file_name_base = f"{sanitized_track_title}"
+        with stats.stage("commit" if savepoint is None else "db_resolve"):
+            _flush_or_commit(db, savepoint)
+        logger.info(f"Successfully cataloged in DB: {file_name} (Artist: {folder_artist_name}, Album: {album_title}, Track: {track_title})")
 
-        new_file_name = f"{sanitize_path_component(new_file_name_base)}{file_ext}"
+        file_ext = os.path.splitext(file_name)[1]
+        target_album_dir = layout.album_dir(folder_artist_name, album_title, release_year, release_type)
+        new_file_name = layout.file_name(folder_artist_name, album_title, track_title, track_number, disknumber, is_single, file_ext)
         target_file_path = os.path.join(target_album_dir, new_file_name)
 
-        os.makedirs(target_album_dir, exist_ok=True)
-        
-        if os.path.exists(target_file_path):
-            logger.warning(f"Target file already exists, skipping move to avoid overwrite: {target_file_path}. DB entry exists.")
+        pending_transfer = PendingTransfer(album_model, target_album_dir, [(file_path, target_file_path, metadata)])
+        if pending_transfers is not None:
+            pending_transfers.append(pending_transfer)
             return True
-        
-        shutil.move(file_path, target_file_path)
-        logger.info(f"Successfully moved file from '{file_path}' to '{target_file_path}'")
-
-        if metadata.get('cover_path'):
-            source_cover_path = metadata['cover_path']
-            if os.path.exists(source_cover_path):
-                cover_filename = os.path.basename(source_cover_path)
-                target_cover_path = os.path.join(target_album_dir, cover_filename)
-                if not os.path.exists(target_cover_path):
-                    try:
-                        shutil.move(source_cover_path, target_cover_path)
-                        logger.info(f"Successfully moved cover from '{source_cover_path}' to '{target_cover_path}'")
-                    except Exception as e:
-                        logger.error(f"Failed to move cover file {source_cover_path}: {e}")
-                else:
-                    logger.debug(f"Cover art already exists at {target_cover_path}, skipping move.")
-
-        return True
+        return _transfer_pending(db, [pending_transfer], transfer_session, directory_cache, stats) == 1
 
     except IntegrityError as e:
-        db.rollback()
+        _rollback(db, savepoint)
         logger.warning(f"IntegrityError during import of {file_name}: {e}. File might already be imported or DB constraint violation.", exc_info=True)
         if unmatched_file_id:
             unmatched_file = db.query(UnmatchedFile).filter(UnmatchedFile.Id == unmatched_file_id).first()
             if unmatched_file:
                 db.delete(unmatched_file)
-                db.commit()
+                _flush_or_commit(db, savepoint)
                 logger.info(f"Removed duplicate unmatched file entry with ID {unmatched_file_id} as it was already imported.")
         return False
     except FileNotFoundError:
-        db.rollback()
-        logger.error(f"File not found during move operation: {file_path}. It might have been moved/deleted externally.", exc_info=True)
+        _rollback(db, savepoint)
+        logger.error(f"File not found during import: {file_path}. It might have been moved/deleted externally.", exc_info=True)
         return False
     except Exception as e:
-        db.rollback()
-        logger.error(f"Error importing or moving file {file_name}: {e}", exc_info=True)
+        _rollback(db, savepoint)
+        logger.error(f"Error importing file {file_name}: {e}", exc_info=True)
+        return False
+
+def _is_settled(dir_files: list[tuple[str, str, os.stat_result]]) -> bool:
+    newest_mtime = max(file_stat.st_mtime for _, _, file_stat in dir_files)
+    return datetime.now().timestamp() - newest_mtime >= ALBUM_SETTLE_SECONDS
+
+def _is_album_unit(album_model: dict, dir_files: list[tuple[str, str, os.stat_result]]) -> bool:
+    # Only a directory that holds one tagged album and nothing already known is imported as
+    # a unit; anything else falls back to importing its files one by one.
+    if len(dir_files) < 2 or len(dir_files) != len(album_model['tracks']):
+        return False
+    if any(file_path not in album_model['tracks'] for file_path, _, _ in dir_files):
+        return False
+    album_keys = list(album_model['album_counts'])
+    return len(album_keys) == 1 and album_keys[0] != 'unknown album'
+
+def _add_unmatched_file(db: Session, file_path: str, file_name: str, file_stat: os.stat_result, detected: dict):
+    unmatched_entry = UnmatchedFile(
+        FilePath=file_path,
+        FileName=file_name,
+        FileSize=file_stat.st_size,
+        DetectedArtist=detected.get('artist') or 'Unknown',
+        DetectedAlbum=detected.get('album') or 'Unknown',
+        DetectedTitle=detected.get('title') or 'Unknown',
+        DetectedTrackNumber=detected.get('track_number'),
+        ScanTimestamp=datetime.now().isoformat(),
+        IsMatched=False,
+        Ignored=False
+    )
+    try:
+        with db.begin_nested():
+            db.add(unmatched_entry)
+        logger.info(f"File '{file_name}' added to unmatched files.")
+    except IntegrityError:
+        logger.warning(f"File '{file_name}' already exists in unmatched files. Skipping add.")
+    scan_state.record_file_state(db, file_path, file_stat)
+
+def _import_album(db: Session, dir_path: str, dir_files: list[tuple[str, str, os.stat_result]], album_model: dict, entity_index: EntityIndex, layout: LibraryLayout, pending_transfers: list[PendingTransfer], stats: ScanStats) -> bool:
+    if not layout.library_folder_path or not os.path.isdir(layout.library_folder_path):
+        logger.error(f"Cannot import album from '{dir_path}': Library folder path not configured or does not exist: {layout.library_folder_path}")
+        return False
+
+    tracks = [(file_path, file_name, file_stat, album_model['tracks'][file_path]) for file_path, file_name, file_stat in dir_files]
+    album_title = Counter(metadata['album'] for _, _, _, metadata in tracks).most_common(1)[0][0]
+    album_artists = {metadata['albumartist'] for _, _, _, metadata in tracks if metadata.get('albumartist')}
+    album_metadata = {
+        'artist': Counter(metadata['artist'] for _, _, _, metadata in tracks).most_common(1)[0][0],
+        'albumartist': next(iter(album_artists)) if len(album_artists) == 1 else None,
+    }
+    release_type, release_year = _classify_release(tracks[0][3], album_model)
+
+    savepoint = db.begin_nested()
+    try:
+        with stats.stage("db_resolve"):
+            artist_db_entry, folder_artist_name = _resolve_artist(entity_index, album_metadata)
+            release = entity_index.get_or_create_release(artist_db_entry, folder_artist_name, album_title, release_year, release_type)
+            for file_path, file_name, file_stat, metadata in tracks:
+                track = entity_index.get_or_create_track(release, folder_artist_name, album_title, metadata['title'], metadata['track_number'], metadata['duration'])
+                db.add(ImportedFile(
+                    FilePath=file_path,
+                    FileName=file_name,
+                    FileSize=file_stat.st_size,
+                    ImportTimestamp=datetime.now().isoformat(),
+                    **links(track=track, release=release, artist=artist_db_entry)
+                ))
+                metadata_cache.forget(db, file_path)
+            db.flush()
+
+        target_album_dir = layout.album_dir(folder_artist_name, album_title, release_year, release_type)
+        album_files = []
+        for file_path, file_name, _, metadata in tracks:
+            new_file_name = layout.file_name(folder_artist_name, album_title, metadata['title'], metadata['track_number'], metadata['disknumber'], release_type == 'Single', os.path.splitext(file_name)[1])
+            album_files.append((file_path, os.path.join(target_album_dir, new_file_name), metadata))
+        savepoint.commit()
+    except Exception as e:
+        _rollback(db, savepoint)
+        logger.error(f"Error importing album '{album_title}' from '{dir_path}': {e}. Its files are kept as unmatched.", exc_info=True)
         return False
 
-def scan_import_folder(db: Session) -> tuple[list[UnmatchedFile], int]:
-    import_folder_path = _get_config_value(db, "ImportFolderPath")
+    pending_transfers.append(PendingTransfer(album_model, target_album_dir, album_files))
+    logger.info(f"Cataloged album '{album_title}' by {folder_artist_name} from '{dir_path}' as one unit ({len(tracks)} tracks).")
+    return True
+
+def get_import_folder_path(db: Session) -> str | None:
+    return _get_config_value(db, "ImportFolderPath")
+
+def scan_import_folder(db: Session, directories: list[str] | None = None, progress: Callable[[int, int | None], None] | None = None) -> tuple[int, int]:
+    import_folder_path = get_import_folder_path(db)
     if not import_folder_path or not os.path.isdir(import_folder_path):
         logger.error(f"Scan failed: Import folder path not configured or does not exist: {import_folder_path}")
         raise ValueError("Import folder path not configured or does not exist.")
 
     matched_count = 0
-    
-    existing_unmatched_paths = {f.FilePath for f in db.query(UnmatchedFile).filter(UnmatchedFile.Ignored == False).all()}
-    existing_imported_paths = {f.FilePath for f in db.query(ImportedFile).all()}
 
-    files_to_process = []
-    for root, _, files in os.walk(import_folder_path):
-        for file_name in files:
-            if not file_name.lower().endswith(('.mp3', '.flac', '.wav', '.aac', '.ogg', '.m4a')):
-                continue
+    worker_mode, worker_count = worker_pool.parse_worker_settings(
+        _get_config_value(db, "ImportWorkerMode"),
+        _get_config_value(db, "ImportWorkerCount")
+    )
 
-            file_path = os.path.join(root, file_name)
-            
-            if file_path in existing_unmatched_paths:
-                logger.debug(f"File already in unmatched list: {file_path}")
-                continue
-            
-            if file_path in existing_imported_paths:
-                logger.debug(f"File already imported: {file_path}")
+    entity_index = EntityIndex(db)
+    layout = load_layout(db)
+    transfer_session = _load_transfer_session(db)
+    stats = ScanStats(scan_stats.load_slow_file_seconds(db))
+
+    commit_batch_size = _get_int_config_value(db, "ImportCommitBatchSize", DEFAULT_COMMIT_BATCH_SIZE)
+    pending_transfers = []
+    pending_files = 0
+    processed_files = 0
+    if progress:
+        progress(processed_files, None)
+
+    directory_cache = DirectoryCache(AUDIO_EXTENSIONS)
+    discovered_files = scan_state.iter_changed_files(db, import_folder_path, AUDIO_EXTENSIONS, start_dirs=directories, directory_cache=directory_cache, stats=stats)
+    for files_by_directory in _iter_directory_batches(_iter_unknown_files(db, discovered_files, stats), IMPORT_BATCH_SIZE):
+        dir_batch = []
+        for dir_path, dir_files in files_by_directory.items():
+            # A full scan leaves directories that are still being written to for a later
+            # scan; the watcher already waits for its directories to go quiet.
+            if directories is None and not _is_settled(dir_files):
+                logger.info(f"Files in '{dir_path}' are still changing. Leaving the directory for a later scan.")
+                processed_files += len(dir_files)
                 continue
-            
-            files_to_process.append((file_path, file_name))
+            dir_batch.append(dir_path)
 
-    for file_path, file_name in files_to_process:
-        try:
-            file_size = os.path.getsize(file_path)
-            
-            success = _import_file_logic(db, file_path, file_name, file_size)
+        album_models = _build_album_models(db, dir_batch, worker_mode, worker_count, directory_cache, stats)
+        with stats.stage("db_resolve"):
+            _preload_entities(entity_index, [
+                album_models[dir_path]['tracks'][file_path]
+                for dir_path in dir_batch
+                for file_path, _, _ in files_by_directory[dir_path]
+                if file_path in album_models[dir_path]['tracks']
+            ])
+        for dir_path in dir_batch:
+            album_model = album_models[dir_path]
+            dir_files = files_by_directory[dir_path]
 
-            if success:
-                matched_count += 1
-                existing_imported_paths.add(file_path)
-            else:
-                unmatched_entry = UnmatchedFile(
-                    FilePath=file_path,
-                    FileName=file_name,
-                    FileSize=file_size,
-                    DetectedArtist='Unknown',
-                    DetectedAlbum='Unknown',
-                    DetectedTitle='Unknown',
-                    ScanTimestamp=datetime.now().isoformat(),
-                    IsMatched=False,
-                    Ignored=False
-                )
-                db.add(unmatched_entry)
+            if _is_album_unit(album_model, dir_files):
+                claimed_paths = []
+                for file_path, _, _ in dir_files:
+                    if not coordinator.try_claim(file_path):
+                        break
+                    claimed_paths.append(file_path)
+                try:
+                    if len(claimed_paths) < len(dir_files):
+                        logger.info(f"Files in '{dir_path}' are being imported by another request. Skipping the album in this scan.")
+                        processed_files += len(dir_files)
+                        continue
+                    with stats.track_file(dir_path, len(dir_files)):
+                        album_imported = _import_album(db, dir_path, dir_files, album_model, entity_index, layout, pending_transfers, stats)
+                        if album_imported:
+                            matched_count += _commit_import_batch(db, pending_transfers, transfer_session, directory_cache, stats)
+                        else:
+                            with stats.stage("db_resolve"):
+                                for file_path, file_name, file_stat in dir_files:
+                                    _add_unmatched_file(db, file_path, file_name, file_stat, album_model['tracks'].get(file_path, {}))
+                    if not album_imported:
+                        pending_files += len(dir_files)
+                        processed_files += len(dir_files)
+                        continue
+                    pending_files = 0
+                    processed_files += len(dir_files)
+                    if progress:
+                        progress(processed_files, None)
+                    continue
+                finally:
+                    for file_path in claimed_paths:
+                        coordinator.release(file_path)
+
+            for file_path, file_name, file_stat in dir_files:
+                if not coordinator.try_claim(file_path):
+                    logger.info(f"File '{file_name}' is being imported by another request. Skipping it in this scan.")
+                    processed_files += 1
+                    continue
+                savepoint = None
                 try:
-                    db.commit()
-                except IntegrityError:
-                    db.rollback()
-                    logger.warning(f"File '{file_name}' already exists in unmatched files. Skipping add.")
-                logger.info(f"File '{file_name}' added to unmatched files.")
+                    with stats.track_file(file_path):
+                        savepoint = db.begin_nested()
+
+                        success = _import_file_logic(db, file_path, file_name, file_stat.st_size, album_model=album_model, entity_index=entity_index, savepoint=savepoint, pending_transfers=pending_transfers, directory_cache=directory_cache, layout=layout, transfer_session=transfer_session, stats=stats)
+                        if savepoint.is_active:
+                            savepoint.commit()
+
+                        if not success:
+                            with stats.stage("db_resolve"):
+                                _add_unmatched_file(db, file_path, file_name, file_stat, album_model['tracks'].get(file_path, {}))
+                        pending_files += 1
             
+                except Exception as e:
+                    _rollback(db, savepoint)
+                    logger.error(f"Error processing file {file_path} during scan: {e}", exc_info=True)
+                finally:
+                    coordinator.release(file_path)
+                    processed_files += 1
+
+            if pending_files >= commit_batch_size:
+                matched_count += _commit_import_batch(db, pending_transfers, transfer_session, directory_cache, stats)
+                pending_files = 0
+                # Reported only between transactions, so a progress writer on another
+                # connection never waits on this scan's write lock.
+                if progress:
+                    progress(processed_files, None)
+        # The next batch's discovery and tag extraction must not run inside an open
+        # write transaction.
+        if pending_files:
+            matched_count += _commit_import_batch(db, pending_transfers, transfer_session, directory_cache, stats)
+            pending_files = 0
+            if progress:
+                progress(processed_files, None)
+        directory_cache.release()
+
+    with stats.stage("commit"):
+        db.commit()
+    if progress:
+        progress(processed_files, processed_files)
+    
+    with stats.stage("cleanup"):
+        _clean_import_directory(import_folder_path, directory_cache)
+    logger.debug(f"Directory cache listed {directory_cache.listed_count} directories not already listed by discovery.")
+
+    unmatched_count = count_unmatched_files(db)
+    # Idle polls are not stored, so the kept history covers runs that did something.
+    if processed_files or stats.total_seconds() >= stats.slow_file_seconds:
+        logger.info(f"Import scan stats: {stats.summary(processed_files)}")
+        try:
+            stats.save(db, "full" if directories is None else f"{len(directories)} directories", processed_files, matched_count, unmatched_count)
         except Exception as e:
             db.rollback()
-            logger.error(f"Error processing file {file_path} during scan: {e}", exc_info=True)
-    
-    _clean_import_directory(import_folder_path)
+            logger.warning(f"Could not store import scan stats: {e}")
+    return unmatched_count, matched_count
 
-    return get_unmatched_files(db), matched_count
+def run_scan(db: Session, directories: list[str] | None = None, progress: Callable[[int, int | None], None] | None = None) -> tuple[int, int]:
+    def scan(scope: list[str] | None, scan_progress: Callable[[int, int | None], None]) -> tuple[int, int]:
+        return scan_import_folder(db, directories=scope, progress=scan_progress)
+    return coordinator.run(scan, directories, progress)
 
 def match_unmatched_file(db: Session, file_id: int) -> bool:
     unmatched_file = db.query(UnmatchedFile).filter(UnmatchedFile.Id == file_id).first()
@@ -572,7 +975,16 @@ def match_unmatched_file(db: Session, file_id: int) -> bool:
         logger.warning(f"Unmatched file with ID {file_id} not found for matching.")
         return False
 
-    return _import_file_logic(db, unmatched_file.FilePath, unmatched_file.FileName, unmatched_file.FileSize, unmatched_file.Id)
+    with coordinator.exclusive(), coordinator.claim(unmatched_file.FilePath) as claimed:
+        if not claimed:
+            logger.warning(f"File {unmatched_file.FileName} is already being imported by another request.")
+            return False
+        directory_cache = DirectoryCache(AUDIO_EXTENSIONS)
+        success = _import_file_logic(db, unmatched_file.FilePath, unmatched_file.FileName, unmatched_file.FileSize, unmatched_file.Id, directory_cache=directory_cache)
+        import_folder_path = get_import_folder_path(db)
+        if success and import_folder_path:
+            _clean_import_directory(import_folder_path, directory_cache)
+        return success
 
 def ignore_unmatched_file(db: Session, file_id: int) -> bool:
     unmatched_file = db.query(UnmatchedFile).filter(UnmatchedFile.Id == file_id).first()
@@ -582,4 +994,110 @@ def ignore_unmatched_file(db: Session, file_id: int) -> bool:
         logger.info(f"Ignored unmatched file: {unmatched_file.FileName}")
         return True
     logger.warning(f"Unmatched file with ID {file_id} not found for ignoring.")
-    return False
\ No newline at end of file
+    return False
+
+def _select_unmatched_ids(db: Session, file_ids: list[int] | None = None, directory: str | None = None) -> list[int]:
+    query = db.query(UnmatchedFile.Id, UnmatchedFile.FilePath).filter(UnmatchedFile.Ignored == False)
+    if directory:
+        query = _filter_unmatched_directory(query, directory)
+    if file_ids is None:
+        rows = query.all()
+    else:
+        rows = [
+            row
+            for chunk in _iter_chunks(set(file_ids), DISCOVERY_CHUNK_SIZE)
+            for row in query.filter(UnmatchedFile.Id.in_(chunk)).all()
+        ]
+    return [file_id for file_id, _ in sorted(rows, key=lambda row: row[1])]
+
+def match_unmatched_files(db: Session, file_ids: list[int] | None = None, directory: str | None = None, progress: Callable[[int, int | None], None] | None = None) -> tuple[int, int]:
+    layout = load_layout(db)
+    if not layout.library_folder_path or not os.path.isdir(layout.library_folder_path):
+        raise ValueError("Library folder path not configured or does not exist.")
+
+    selected_ids = _select_unmatched_ids(db, file_ids, directory)
+    total = len(selected_ids)
+    logger.info(f"Bulk matching {total} unmatched files.")
+    if progress:
+        progress(0, total)
+
+    entity_index = EntityIndex(db)
+    transfer_session = _load_transfer_session(db)
+    directory_cache = DirectoryCache(AUDIO_EXTENSIONS)
+    commit_batch_size = _get_int_config_value(db, "ImportCommitBatchSize", DEFAULT_COMMIT_BATCH_SIZE)
+    stats = ScanStats()
+    pending_transfers = []
+    matched_ids = []
+    matched_count = 0
+    processed_files = 0
+
+    def commit_batch():
+        nonlocal matched_count
+        if matched_ids:
+            db.query(UnmatchedFile).filter(UnmatchedFile.Id.in_(matched_ids)).delete(synchronize_session=False)
+        matched_count += _commit_import_batch(db, pending_transfers, transfer_session, directory_cache, stats)
+        matched_ids.clear()
+        if progress:
+            progress(processed_files, total)
+
+    for id_chunk in _iter_chunks(selected_ids, IMPORT_BATCH_SIZE):
+        # Scans in other gunicorn workers wait between chunks rather than for the whole match.
+        with coordinator.exclusive():
+            unmatched_files = db.query(UnmatchedFile).filter(UnmatchedFile.Id.in_(id_chunk)).order_by(UnmatchedFile.FilePath).all()
+            files_by_directory = defaultdict(list)
+            for unmatched_file in unmatched_files:
+                files_by_directory[os.path.dirname(unmatched_file.FilePath)].append(unmatched_file)
+
+            # Tags come from the metadata cache the scan filled, so the files are not parsed again.
+            album_models = _build_album_models(db, list(files_by_directory), directory_cache=directory_cache)
+            _preload_entities(entity_index, [
+                album_models[dir_path]['tracks'][unmatched_file.FilePath]
+                for dir_path, dir_files in files_by_directory.items()
+                for unmatched_file in dir_files
+                if unmatched_file.FilePath in album_models[dir_path]['tracks']
+            ])
+
+            for dir_path, dir_files in files_by_directory.items():
+                for unmatched_file in dir_files:
+                    processed_files += 1
+                    if not coordinator.try_claim(unmatched_file.FilePath):
+                        logger.info(f"File '{unmatched_file.FileName}' is being imported by another request. Skipping it.")
+                        continue
+                    savepoint = None
+                    try:
+                        savepoint = db.begin_nested()
+                        if _import_file_logic(db, unmatched_file.FilePath, unmatched_file.FileName, unmatched_file.FileSize, album_model=album_models[dir_path], entity_index=entity_index, savepoint=savepoint, pending_transfers=pending_transfers, directory_cache=directory_cache, layout=layout, transfer_session=transfer_session, stats=stats):
+                            matched_ids.append(unmatched_file.Id)
+                        elif db.query(ImportedFile.Id).filter(ImportedFile.FilePath == unmatched_file.FilePath).first():
+                            matched_ids.append(unmatched_file.Id)
+                            logger.info(f"Removed duplicate unmatched file entry with ID {unmatched_file.Id} as it was already imported.")
+                        if savepoint.is_active:
+                            savepoint.commit()
+                    except Exception as e:
+                        _rollback(db, savepoint)
+                        logger.error(f"Error matching file {unmatched_file.FilePath}: {e}", exc_info=True)
+                    finally:
+                        coordinator.release(unmatched_file.FilePath)
+
+                    if len(matched_ids) >= commit_batch_size:
+                        commit_batch()
+            commit_batch()
+            directory_cache.release()
+
+    import_folder_path = get_import_folder_path(db)
+    if import_folder_path:
+        _clean_import_directory(import_folder_path, directory_cache)
+    logger.info(f"Bulk match finished: {matched_count} of {total} files imported.")
+    return matched_count, total
+
+def ignore_unmatched_files(db: Session, file_ids: list[int] | None = None, directory: str | None = None, progress: Callable[[int, int | None], None] | None = None) -> int:
+    selected_ids = _select_unmatched_ids(db, file_ids, directory)
+    total = len(selected_ids)
+    ignored_count = 0
+    for id_chunk in _iter_chunks(selected_ids, IMPORT_BATCH_SIZE):
+        ignored_count += db.query(UnmatchedFile).filter(UnmatchedFile.Id.in_(id_chunk)).update({UnmatchedFile.Ignored: True}, synchronize_session=False)
+        db.commit()
+        if progress:
+            progress(ignored_count, total)
+    logger.info(f"Ignored {ignored_count} unmatched files.")
+    return ignored_count
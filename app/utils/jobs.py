@@ -0,0 +1,83 @@
+# /app/utils/jobs.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from ..db import SessionLocal
+from ..models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("completed", "failed")
+MAX_JOB_WORKERS = 2
+KEEP_FINISHED_JOBS = 100
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_JOB_WORKERS, thread_name_prefix="background-job")
+        return _executor
+
+def _update_job(job_id: int, **fields):
+    db = SessionLocal()
+    try:
+        db.query(BackgroundJob).filter(BackgroundJob.Id == job_id).update(fields, synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Could not update background job {job_id}: {e}")
+    finally:
+        db.close()
+
+def _prune_finished_jobs(db: Session):
+    stale_ids = [
+        job_id for (job_id,) in db.query(BackgroundJob.Id)
+        .filter(BackgroundJob.Status.in_(FINISHED_STATUSES))
+        .order_by(BackgroundJob.Id.desc())
+        .offset(KEEP_FINISHED_JOBS)
+        .all()
+    ]
+    if stale_ids:
+        db.query(BackgroundJob).filter(BackgroundJob.Id.in_(stale_ids)).delete(synchronize_session=False)
+
+def _run_job(job_id: int, kind: str, func: Callable[[Callable[[int, int | None], None]], str]):
+    _update_job(job_id, Status="running", StartedTimestamp=datetime.now().isoformat())
+    logger.info(f"Background job {job_id} ({kind}) started.")
+
+    def progress(processed: int, total: int | None):
+        _update_job(job_id, Processed=processed, Total=total)
+
+    try:
+        message = func(progress)
+        _update_job(job_id, Status="completed", Message=message, FinishedTimestamp=datetime.now().isoformat())
+        logger.info(f"Background job {job_id} ({kind}) completed: {message}")
+    except Exception as e:
+        logger.error(f"Background job {job_id} ({kind}) failed: {e}", exc_info=True)
+        _update_job(job_id, Status="failed", Message=str(e), FinishedTimestamp=datetime.now().isoformat())
+
+def submit_job(db: Session, kind: str, func: Callable[[Callable[[int, int | None], None]], str]) -> BackgroundJob:
+    _prune_finished_jobs(db)
+    job = BackgroundJob(Kind=kind, Status="queued", Processed=0, CreatedTimestamp=datetime.now().isoformat())
+    db.add(job)
+    db.commit()
+    _get_executor().submit(_run_job, job.Id, kind, func)
+    logger.info(f"Queued background job {job.Id} ({kind}).")
+    return job
+
+def get_job(db: Session, job_id: int) -> BackgroundJob | None:
+    return db.query(BackgroundJob).filter(BackgroundJob.Id == job_id).first()
+
+def shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,43 @@
+# /app/utils/metadata_cache.py
+import os
+import json
+import logging
+from datetime import datetime
+from sqlalchemy.orm import Session
+
+from ..models import FileMetadataCache
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_CHUNK_SIZE = 500
+
+def _is_fresh(entry: FileMetadataCache, st: os.stat_result) -> bool:
+    return entry.FileSize == st.st_size and entry.MtimeNs == st.st_mtime_ns
+
+def load_cached_metadata(db: Session, file_stats: dict[str, os.stat_result]) -> tuple[dict[str, dict], dict[str, FileMetadataCache]]:
+    cached = {}
+    stale_entries = {}
+    file_paths = list(file_stats)
+    for i in range(0, len(file_paths), LOOKUP_CHUNK_SIZE):
+        chunk = file_paths[i:i + LOOKUP_CHUNK_SIZE]
+        for entry in db.query(FileMetadataCache).filter(FileMetadataCache.FilePath.in_(chunk)).all():
+            if _is_fresh(entry, file_stats[entry.FilePath]):
+                try:
+                    cached[entry.FilePath] = json.loads(entry.Metadata)
+                    continue
+                except ValueError:
+                    logger.warning(f"Discarding corrupt metadata cache entry for {entry.FilePath}.")
+            stale_entries[entry.FilePath] = entry
+    return cached, stale_entries
+
+def store_metadata(db: Session, file_path: str, st: os.stat_result, metadata: dict, entry: FileMetadataCache | None = None):
+    if entry is None:
+        entry = FileMetadataCache(FilePath=file_path)
+        db.add(entry)
+    entry.FileSize = st.st_size
+    entry.MtimeNs = st.st_mtime_ns
+    entry.Metadata = json.dumps({key: value for key, value in metadata.items() if key != 'cover_path'})
+    entry.CachedTimestamp = datetime.now().isoformat()
+
+def forget(db: Session, file_path: str):
+    db.query(FileMetadataCache).filter(FileMetadataCache.FilePath == file_path).delete(synchronize_session=False)
@@ -0,0 +1,177 @@
+# /app/utils/naming.py
+import os
+import re
+import logging
+from string import Formatter
+from typing import Iterable
+from sqlalchemy.orm import Session
+
+from ..models import Config
+
+logger = logging.getLogger(__name__)
+
+FOLDER_PLACEHOLDERS = ('artist', 'year', 'type', 'album')
+FILE_PLACEHOLDERS = ('artist', 'title', 'album', 'disknumber', 'tracknumber')
+
+_INVALID_PATH_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+_WHITESPACE = re.compile(r'\s+')
+_HYPHEN = re.compile(r'\s*-\s*')
+_FILE_PLACEHOLDER = re.compile(r'\{([^{}]*)\}')
+_FILE_FIELD = re.compile(r'\{(' + '|'.join(FILE_PLACEHOLDERS) + r')\}')
+
+class NamingPatternError(ValueError):
+    pass
+
+def sanitize_path_component(name: str) -> str:
+    if not isinstance(name, str):
+        name = str(name)
+    sanitized_name = _INVALID_PATH_CHARS.sub('', name).strip()
+    sanitized_name = sanitized_name.replace(':', ' - ')
+    sanitized_name = sanitized_name.replace('/', '_')
+    sanitized_name = sanitized_name.replace('\\', '_')
+    return sanitized_name
+
+def _parse_folder_pattern(pattern: str) -> list[tuple[str, str | None, str, str | None]]:
+    try:
+        segments = list(Formatter().parse(pattern))
+    except ValueError as e:
+        raise NamingPatternError(f"Invalid FolderStructurePattern '{pattern}': {e}")
+    for _, field_name, _, _ in segments:
+        if field_name is not None and field_name not in FOLDER_PLACEHOLDERS:
+            raise NamingPatternError(
+                f"Unknown placeholder '{{{field_name}}}' in FolderStructurePattern. Allowed: {', '.join('{' + p + '}' for p in FOLDER_PLACEHOLDERS)}"
+            )
+    return segments
+
+def validate_folder_pattern(pattern: str):
+    if pattern:
+        FolderTemplate(pattern)
+
+def validate_file_pattern(pattern: str):
+    if not pattern:
+        return
+    for field_name in _FILE_PLACEHOLDER.findall(pattern):
+        if field_name not in FILE_PLACEHOLDERS:
+            raise NamingPatternError(
+                f"Unknown placeholder '{{{field_name}}}' in FileRenamePattern. Allowed: {', '.join('{' + p + '}' for p in FILE_PLACEHOLDERS)}"
+            )
+
+class FolderTemplate:
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self._segments = _parse_folder_pattern(pattern)
+        # Check conversions and format specs once, so rendering cannot fail per file.
+        self.render({name: '' for name in FOLDER_PLACEHOLDERS})
+
+    def render(self, values: dict[str, str]) -> list[str]:
+        parts = []
+        for literal, field_name, format_spec, conversion in self._segments:
+            parts.append(literal)
+            if field_name is not None:
+                value = values[field_name]
+                if conversion == 'r':
+                    value = repr(value)
+                elif conversion == 'a':
+                    value = ascii(value)
+                try:
+                    parts.append(format(value, format_spec))
+                except ValueError as e:
+                    raise NamingPatternError(f"Invalid format for '{{{field_name}}}' in FolderStructurePattern: {e}")
+        return [sanitize_path_component(part) for part in ''.join(parts).split('/')]
+
+class FileNameTemplate:
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        # Unknown placeholders in patterns saved before validation existed stay literal, as before.
+        self._segments = _FILE_FIELD.split(pattern)
+
+    def render(self, values: dict[str, str]) -> str:
+        rendered = ''.join(
+            values[segment] if i % 2 else segment
+            for i, segment in enumerate(self._segments)
+        )
+        rendered = _WHITESPACE.sub(' ', rendered).strip()
+        return _HYPHEN.sub(' - ', rendered).strip(' -')
+
+class LibraryLayout:
+    def __init__(self, library_folder_path: str | None, folder_pattern: str | None, file_rename_pattern: str | None):
+        self.library_folder_path = library_folder_path
+        self.folder_template = None
+        self.file_template = FileNameTemplate(file_rename_pattern) if file_rename_pattern else None
+        self._album_dirs: dict[tuple, str] = {}
+
+        if folder_pattern:
+            try:
+                self.folder_template = FolderTemplate(folder_pattern)
+            except NamingPatternError as e:
+                logger.warning(f"{e}. Falling back to the default folder layout.")
+
+    def album_dir(self, artist: str, album: str, release_year: int | None, release_type: str) -> str:
+        key = (artist, album, release_year, release_type)
+        album_dir = self._album_dirs.get(key)
+        if album_dir is not None:
+            return album_dir
+
+        sanitized_artist = sanitize_path_component(artist)
+        sanitized_album = sanitize_path_component(album)
+        if self.folder_template:
+            parts = self.folder_template.render({
+                'artist': sanitized_artist,
+                'year': sanitize_path_component(str(release_year) if release_year else 'Unknown Year'),
+                'type': sanitize_path_component(release_type),
+                'album': sanitized_album,
+            })
+            album_dir = os.path.join(self.library_folder_path, *parts)
+        elif release_type == 'Single':
+            album_dir = os.path.join(self.library_folder_path, sanitized_artist, "Singles", sanitized_album)
+        else:
+            album_dir = os.path.join(self.library_folder_path, sanitized_artist, sanitized_album)
+
+        self._album_dirs[key] = album_dir
+        return album_dir
+
+    def file_name(self, artist: str, album: str, title: str, track_number: int | None, disknumber: int | None, is_single: bool, file_ext: str) -> str:
+        sanitized_artist = sanitize_path_component(artist)
+        sanitized_album = sanitize_path_component(album)
+        sanitized_title = sanitize_path_component(title)
+
+        if self.file_template:
+            file_name_base = self.file_template.render({
+                'artist': sanitized_artist,
+                'title': sanitized_title,
+                'album': sanitized_album,
+                'disknumber': f"{disknumber:01d} " if disknumber is not None and disknumber > 1 else "",
+                'tracknumber': f"{track_number:02d} " if track_number is not None else "",
+            })
+        elif is_single:
+            file_name_base = f"{sanitized_artist} - {sanitized_title}"
+            if sanitized_album and sanitized_album.lower() not in sanitized_title.lower() and sanitized_album != 'Unknown Album':
+                file_name_base = f"{sanitized_artist} - {sanitized_title} ({sanitized_album})"
+        elif track_number is not None:
+            file_name_base = f"{track_number:02d} - {sanitized_title}"
+        else:
+            file_name_base = sanitized_title
+
+        return f"{sanitize_path_component(file_name_base)}{file_ext}"
+
+    def target_path(self, item: dict) -> str:
+        album_dir = self.album_dir(item['artist'], item['album'], item['release_year'], item['release_type'])
+        file_name = self.file_name(
+            item['artist'], item['album'], item['title'], item['track_number'], item['disknumber'],
+            item['release_type'] == 'Single', item['file_ext']
+        )
+        return os.path.join(album_dir, file_name)
+
+    def render_batch(self, items: Iterable[dict]) -> list[str]:
+        return [self.target_path(item) for item in items]
+
+def _get_config_value(db: Session, key: str) -> str | None:
+    config_entry = db.query(Config).filter(Config.Key == key).first()
+    return config_entry.Value if config_entry else None
+
+def load_layout(db: Session) -> LibraryLayout:
+    return LibraryLayout(
+        _get_config_value(db, "LibraryFolderPath"),
+        _get_config_value(db, "FolderStructurePattern"),
+        _get_config_value(db, "FileRenamePattern")
+    )
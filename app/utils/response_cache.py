@@ -0,0 +1,199 @@
+# /app/utils/response_cache.py
+import time
+import logging
+import threading
+from typing import NamedTuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..db import CacheSessionLocal
+from ..models import Config, ProviderResponse
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 24 * 60 * 60
+# Providers without an entry are never cached.
+CACHE_TTL_SECONDS = {
+    "musicbrainz": 7 * DAY_SECONDS,
+    "coverartarchive": 30 * DAY_SECONDS,
+    "discogs": 7 * DAY_SECONDS,
+    "deezer": DAY_SECONDS,
+    "qobuz": DAY_SECONDS,
+}
+# Providers that report errors inside a 200 response, which must not be cached.
+ERROR_BODY_PROVIDERS = {"deezer"}
+# Query parameters that change on every request without changing the response.
+IGNORED_QUERY_PARAMS = {
+    "qobuz": {"request_ts", "request_sig"},
+}
+DEFAULT_MAX_MB = 256
+MAX_ENTRY_BYTES = 16 * 1024 * 1024
+EVICT_TARGET_RATIO = 0.9
+EVICT_CHECK_INTERVAL = 50
+ACCESS_UPDATE_SECONDS = 60
+CACHE_STATUS_HEADER = "X-Releasarr-Cache"
+
+class CachedResponse(NamedTuple):
+    key: str
+    body: bytes
+    content_type: str | None
+    etag: str | None
+    last_modified: str | None
+    expires: float
+    last_accessed: float
+
+_stores_since_evict = 0
+_evict_lock = threading.Lock()
+
+def cache_key(provider: str, url: str) -> str:
+    ignored = IGNORED_QUERY_PARAMS.get(provider)
+    if ignored:
+        parts = urlsplit(url)
+        query = urlencode([(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name not in ignored])
+        url = urlunsplit(parts._replace(query=query))
+    return f"{provider}:{url}"
+
+def load_max_bytes(db: Session) -> int:
+    config_entry = db.query(Config).filter(Config.Key == "ProviderCacheMaxMB").first()
+    if not config_entry or not config_entry.Value:
+        return DEFAULT_MAX_MB * 1024 * 1024
+    try:
+        return max(int(config_entry.Value), 0) * 1024 * 1024
+    except ValueError:
+        logger.warning(f"Invalid ProviderCacheMaxMB '{config_entry.Value}', using {DEFAULT_MAX_MB}.")
+        return DEFAULT_MAX_MB * 1024 * 1024
+
+def lookup(key: str) -> CachedResponse | None:
+    db = CacheSessionLocal()
+    try:
+        entry = db.query(ProviderResponse).filter(ProviderResponse.CacheKey == key).first()
+        if entry is None:
+            return None
+        return CachedResponse(key, entry.Body, entry.ContentType, entry.ETag, entry.LastModified, entry.ExpiresTimestamp, entry.LastAccessedTimestamp)
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not read the provider cache: {e}")
+        return None
+    finally:
+        db.close()
+
+def conditional_headers(cached: CachedResponse) -> dict[str, str]:
+    headers = {}
+    if cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+    return headers
+
+def to_response(cached: CachedResponse, url: str, status: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = cached.body
+    response.headers = CaseInsensitiveDict({CACHE_STATUS_HEADER: status})
+    if cached.content_type:
+        response.headers["Content-Type"] = cached.content_type
+    response.encoding = get_encoding_from_headers(response.headers)
+    return response
+
+def is_storable(provider: str, response: requests.Response) -> bool:
+    cache_control = response.headers.get("Cache-Control", "").lower()
+    if response.status_code != 200 or "no-store" in cache_control or len(response.content) > MAX_ENTRY_BYTES:
+        return False
+    if provider in ERROR_BODY_PROVIDERS:
+        try:
+            data = response.json()
+        except ValueError:
+            return False
+        return not (isinstance(data, dict) and data.get("error"))
+    return True
+
+def touch(cached: CachedResponse):
+    # Hits only record their access time once a minute, so a busy refresh does not
+    # turn every cached read into a write.
+    now = time.time()
+    if now - cached.last_accessed < ACCESS_UPDATE_SECONDS:
+        return
+    _update(cached.key, {ProviderResponse.LastAccessedTimestamp: now})
+
+def refresh(cached: CachedResponse, ttl: int, response: requests.Response):
+    now = time.time()
+    values = {ProviderResponse.ExpiresTimestamp: now + ttl, ProviderResponse.LastAccessedTimestamp: now}
+    if response.headers.get("ETag"):
+        values[ProviderResponse.ETag] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        values[ProviderResponse.LastModified] = response.headers["Last-Modified"]
+    _update(cached.key, values)
+
+def _update(key: str, values: dict):
+    db = CacheSessionLocal()
+    try:
+        db.query(ProviderResponse).filter(ProviderResponse.CacheKey == key).update(values, synchronize_session=False)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.warning(f"Could not update the provider cache: {e}")
+    finally:
+        db.close()
+
+def store(provider: str, key: str, ttl: int, response: requests.Response, max_bytes: int):
+    global _stores_since_evict
+    now = time.time()
+    db = CacheSessionLocal()
+    try:
+        db.merge(ProviderResponse(
+            CacheKey=key,
+            Provider=provider,
+            Body=response.content,
+            ContentType=response.headers.get("Content-Type"),
+            ETag=response.headers.get("ETag"),
+            LastModified=response.headers.get("Last-Modified"),
+            Size=len(response.content),
+            FetchedTimestamp=now,
+            ExpiresTimestamp=now + ttl,
+            LastAccessedTimestamp=now
+        ))
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.warning(f"Could not store a provider response in the cache: {e}")
+        return
+    finally:
+        db.close()
+
+    with _evict_lock:
+        _stores_since_evict += 1
+        if _stores_since_evict < EVICT_CHECK_INTERVAL:
+            return
+        _stores_since_evict = 0
+    evict(max_bytes)
+
+def evict(max_bytes: int):
+    # Drops the least recently used entries once the cache is over its size limit.
+    db = CacheSessionLocal()
+    try:
+        total = db.query(func.coalesce(func.sum(ProviderResponse.Size), 0)).scalar()
+        if total <= max_bytes:
+            return
+        target = int(max_bytes * EVICT_TARGET_RATIO)
+        stale_keys = []
+        entries = db.query(ProviderResponse.CacheKey, ProviderResponse.Size).order_by(ProviderResponse.LastAccessedTimestamp).all()
+        for key, size in entries:
+            if total <= target:
+                break
+            stale_keys.append(key)
+            total -= size
+        for i in range(0, len(stale_keys), 500):
+            db.query(ProviderResponse).filter(ProviderResponse.CacheKey.in_(stale_keys[i:i + 500])).delete(synchronize_session=False)
+        db.commit()
+        logger.info(f"Evicted {len(stale_keys)} provider responses from the cache.")
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.warning(f"Could not evict provider cache entries: {e}")
+    finally:
+        db.close()
@@ -0,0 +1,174 @@
+# /app/utils/scan_coordinator.py
+import os
+import logging
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable
+
+from ..db import engine
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SCAN_LOCK_PATH = os.path.join(os.path.dirname(engine.url.database or "") or ".", "import_scan.lock")
+_lock_warning_logged = False
+
+@contextmanager
+def _process_lock():
+    # Every gunicorn worker runs its own scheduler and watcher; the file lock keeps
+    # their scans from overlapping. Later scans find nothing changed and return quickly.
+    global _lock_warning_logged
+    if fcntl is None:
+        yield
+        return
+    try:
+        lock_file = open(SCAN_LOCK_PATH, "a")
+    except OSError as e:
+        if not _lock_warning_logged:
+            logger.warning(f"Could not open scan lock file {SCAN_LOCK_PATH}: {e}. Scans are only coordinated within this process.")
+            _lock_warning_logged = True
+        yield
+        return
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+class ScanCoordinator:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running: Future | None = None
+        self._running_is_full = False
+        self._next: Future | None = None
+        self._next_directories: set[str] | None = None
+        self._next_scan: Callable[[list[str] | None, Callable[[int, int | None], None]], tuple] | None = None
+        # Progress callbacks of every request waiting on the running and queued scans,
+        # so joined and queued requests report the scan that actually serves them.
+        self._running_listeners: list[Callable[[int, int | None], None]] = []
+        self._next_listeners: list[Callable[[int, int | None], None]] = []
+        self._running_progress: tuple[int, int | None] | None = None
+        self._claimed_paths: set[str] = set()
+
+    def _report(self, listeners: list[Callable[[int, int | None], None]]) -> Callable[[int, int | None], None]:
+        def progress(processed: int, total: int | None):
+            with self._lock:
+                if listeners is self._running_listeners:
+                    self._running_progress = (processed, total)
+                callbacks = list(listeners)
+            for callback in callbacks:
+                callback(processed, total)
+        return progress
+
+    def run(self, scan: Callable[[list[str] | None, Callable[[int, int | None], None]], tuple], directories: list[str] | None = None, progress: Callable[[int, int | None], None] | None = None) -> tuple:
+        with self._lock:
+            if self._running is None:
+                future = self._running = Future()
+                self._running_is_full = directories is None
+                listeners = self._running_listeners = [progress] if progress else []
+                self._running_progress = None
+            elif directories is None and self._running_is_full:
+                logger.info("A full import scan is already running; joining it.")
+                future = None
+                queued = self._running
+                last_progress = self._running_progress
+                if progress:
+                    self._running_listeners.append(progress)
+            else:
+                if self._next is None:
+                    # The first queued request's scan runs the follow-up; it stays blocked
+                    # on the result, so its session is not used by two threads at once.
+                    self._next = Future()
+                    self._next_directories = set()
+                    self._next_listeners = []
+                    self._next_scan = scan
+                if directories is None or self._next_directories is None:
+                    self._next_directories = None
+                else:
+                    self._next_directories.update(directories)
+                if progress:
+                    self._next_listeners.append(progress)
+                logger.info("An import scan is already running; queued a follow-up scan.")
+                future = None
+                queued = self._next
+                last_progress = None
+        if future is None:
+            if progress and last_progress:
+                progress(*last_progress)
+            return queued.result()
+
+        self._execute(scan, directories, future, listeners)
+        return future.result()
+
+    def _execute(self, scan: Callable[[list[str] | None, Callable[[int, int | None], None]], tuple], scope: list[str] | None, future: Future, listeners: list[Callable[[int, int | None], None]]):
+        result = None
+        error = None
+        try:
+            with _process_lock():
+                result = scan(scope, self._report(listeners))
+        except Exception as e:
+            error = e
+
+        # A queued follow-up is promoted before this scan's result is published, so a
+        # request arriving in between queues behind it instead of joining a finished scan.
+        with self._lock:
+            next_future = self._next
+            if next_future is None:
+                self._running = None
+                self._running_listeners = []
+                self._running_progress = None
+            else:
+                self._running = next_future
+                next_scan = self._next_scan
+                next_scope = sorted(self._next_directories) if self._next_directories is not None else None
+                self._running_is_full = next_scope is None
+                next_listeners = self._running_listeners = self._next_listeners
+                self._running_progress = None
+                self._next = None
+                self._next_directories = None
+                self._next_listeners = []
+                self._next_scan = None
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+        # Follow-ups run on their own thread, so the request that started this scan
+        # returns as soon as its own scan is done.
+        if next_future is not None:
+            threading.Thread(target=self._execute, args=(next_scan, next_scope, next_future, next_listeners), name="import-scan-follow-up", daemon=True).start()
+
+    @contextmanager
+    def exclusive(self):
+        # Matches take the same file lock as scans, so gunicorn workers never import the
+        # same files at once; path claims only cover requests within one process.
+        with _process_lock():
+            yield
+
+    def try_claim(self, path: str) -> bool:
+        with self._lock:
+            if path in self._claimed_paths:
+                return False
+            self._claimed_paths.add(path)
+            return True
+
+    def release(self, path: str):
+        with self._lock:
+            self._claimed_paths.discard(path)
+
+    @contextmanager
+    def claim(self, path: str):
+        claimed = self.try_claim(path)
+        try:
+            yield claimed
+        finally:
+            if claimed:
+                self.release(path)
+
+coordinator = ScanCoordinator()
@@ -0,0 +1,149 @@
+# /app/utils/scan_state.py
+import os
+import time
+import logging
+from datetime import datetime
+from typing import Iterator
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from ..models import ImportScanState
+from .directory_cache import DirectoryCache, DirectoryEntry
+from .scan_stats import ScanStats
+
+logger = logging.getLogger(__name__)
+
+# Directories modified this recently are re-listed on the next scan, since an entry
+# added within the same mtime tick would otherwise go unnoticed.
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+def _stat_matches(state: ImportScanState, st: os.stat_result) -> bool:
+    if state.MtimeNs != st.st_mtime_ns or state.Inode != st.st_ino:
+        return False
+    return state.IsDirectory or state.Size == st.st_size
+
+def _update_state(db: Session, state: ImportScanState | None, path: str, parent_path: str | None, st: os.stat_result, is_directory: bool, settled: bool = False) -> ImportScanState:
+    if state is None:
+        state = ImportScanState(Path=path, ParentPath=parent_path, IsDirectory=is_directory)
+        db.add(state)
+    state.Size = None if is_directory else st.st_size
+    state.MtimeNs = st.st_mtime_ns
+    state.Inode = st.st_ino
+    state.Settled = settled
+    state.LastSeen = datetime.now().isoformat()
+    return state
+
+def forget_path(db: Session, path: str):
+    db.query(ImportScanState).filter(
+        or_(
+            ImportScanState.Path == path,
+            ImportScanState.Path.startswith(path.rstrip(os.sep) + os.sep, autoescape=True)
+        )
+    ).delete(synchronize_session=False)
+
+def record_file_state(db: Session, file_path: str, st: os.stat_result):
+    state = db.query(ImportScanState).filter(ImportScanState.Path == file_path).first()
+    _update_state(db, state, file_path, os.path.dirname(file_path), st, is_directory=False, settled=True)
+
+def iter_changed_files(db: Session, root_path: str, extensions: tuple[str, ...], start_dirs: list[str] | None = None, directory_cache: DirectoryCache | None = None, stats: ScanStats | None = None) -> Iterator[tuple[str, str, os.stat_result]]:
+    # Files are yielded a directory at a time, once its listing is closed. State changes
+    # are left in the session for the caller to commit along with its own work.
+    if stats is None:
+        stats = ScanStats()
+    changed_files = 0
+    listed_dirs = 0
+    skipped_dirs = 0
+
+    # Directories reported by the watcher are always listed, since a file rewritten
+    # in place does not change its directory's mtime.
+    forced_dirs = set()
+    if start_dirs:
+        root_prefix = root_path.rstrip(os.sep) + os.sep
+        for dir_path in start_dirs:
+            if dir_path == root_path or dir_path.startswith(root_prefix):
+                forced_dirs.add(dir_path)
+        # Nested start directories are covered by the walk of their ancestor.
+        forced_dirs = {
+            d for d in forced_dirs
+            if not any(d != other and d.startswith(other.rstrip(os.sep) + os.sep) for other in forced_dirs)
+        }
+        pending = [
+            (dir_path, os.path.dirname(dir_path) if dir_path != root_path else None,
+             db.query(ImportScanState).filter(ImportScanState.Path == dir_path).first())
+            for dir_path in forced_dirs
+        ]
+    else:
+        root_state = db.query(ImportScanState).filter(ImportScanState.Path == root_path).first()
+        pending = [(root_path, None, root_state)]
+
+    while pending:
+        dir_path, parent_path, dir_state = pending.pop()
+        try:
+            with stats.stage("stat"):
+                dir_stat = os.stat(dir_path)
+        except FileNotFoundError:
+            forget_path(db, dir_path)
+            continue
+        except OSError as e:
+            logger.warning(f"Could not stat directory {dir_path}: {e}")
+            continue
+
+        with stats.stage("db_resolve"):
+            child_states = {
+                s.Path: s for s in db.query(ImportScanState).filter(ImportScanState.ParentPath == dir_path).all()
+            }
+
+        if dir_path not in forced_dirs and dir_state and dir_state.Settled and _stat_matches(dir_state, dir_stat):
+            skipped_dirs += 1
+            for child_path, child_state in child_states.items():
+                if child_state.IsDirectory:
+                    pending.append((child_path, dir_path, child_state))
+            continue
+
+        listed_dirs += 1
+        seen_paths = set()
+        dir_entries = []
+        dir_changed_files = []
+        has_changes = False
+        try:
+            with stats.stage("walk"), os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            seen_paths.add(entry.path)
+                            dir_entries.append(DirectoryEntry(entry.name, entry.path, True, None))
+                            pending.append((entry.path, dir_path, child_states.get(entry.path)))
+                        elif entry.name.lower().endswith(extensions) and entry.is_file():
+                            seen_paths.add(entry.path)
+                            with stats.stage("stat"):
+                                file_stat = entry.stat()
+                            dir_entries.append(DirectoryEntry(entry.name, entry.path, False, file_stat))
+                            file_state = child_states.get(entry.path)
+                            if file_state is None or not _stat_matches(file_state, file_stat):
+                                has_changes = True
+                                dir_changed_files.append((entry.path, entry.name, file_stat))
+                        else:
+                            dir_entries.append(DirectoryEntry(entry.name, entry.path, False, None))
+                    except OSError as e:
+                        has_changes = True
+                        logger.warning(f"Could not stat {entry.path}: {e}")
+        except OSError as e:
+            logger.warning(f"Could not list directory {dir_path}: {e}")
+            continue
+        if directory_cache is not None:
+            directory_cache.store(dir_path, dir_entries)
+
+        for child_path, child_state in child_states.items():
+            if child_path not in seen_paths:
+                if child_state.IsDirectory:
+                    forget_path(db, child_path)
+                else:
+                    db.delete(child_state)
+
+        is_racy = time.time_ns() - dir_stat.st_mtime_ns < RACY_MTIME_WINDOW_NS
+        _update_state(db, dir_state, dir_path, parent_path, dir_stat, is_directory=True, settled=not has_changes and not is_racy)
+
+        changed_files += len(dir_changed_files)
+        yield from dir_changed_files
+
+    logger.info(f"Scan state walk of {', '.join(sorted(forced_dirs)) or root_path}: listed {listed_dirs} directories, skipped {skipped_dirs} unchanged, found {changed_files} new or changed files.")
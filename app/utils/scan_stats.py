@@ -0,0 +1,101 @@
+# /app/utils/scan_stats.py
+import json
+import time
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from ..models import Config, ImportScanRun
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["walk", "stat", "tag_parse", "db_resolve", "commit", "move", "cleanup"]
+DEFAULT_SLOW_FILE_SECONDS = 2.0
+KEEP_SCAN_RUNS = 200
+
+class ScanStats:
+    # Stage times are exclusive: time spent in a nested stage is only counted there,
+    # so the stages of a run add up to at most its total time.
+    def __init__(self, slow_file_seconds: float = DEFAULT_SLOW_FILE_SECONDS):
+        self.slow_file_seconds = slow_file_seconds
+        self.seconds: dict[str, float] = defaultdict(float)
+        self.slow_files = 0
+        self.started_timestamp = datetime.now().isoformat()
+        self._started = time.perf_counter()
+        self._nested: list[float] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.seconds[name] += elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    @contextmanager
+    def track_file(self, path: str, file_count: int = 1):
+        start = time.perf_counter()
+        before = dict(self.seconds)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.slow_file_seconds * file_count:
+                self.slow_files += 1
+                breakdown = ", ".join(
+                    f"{stage} {self.seconds[stage] - before.get(stage, 0.0):.2f}s"
+                    for stage in STAGES if self.seconds[stage] - before.get(stage, 0.0) >= 0.01
+                )
+                logger.warning(f"Slow import: '{path}' took {elapsed:.2f}s ({breakdown or 'no stage above 0.01s'}).")
+
+    def total_seconds(self) -> float:
+        return time.perf_counter() - self._started
+
+    def summary(self, processed_files: int) -> str:
+        total = self.total_seconds()
+        other = max(total - sum(self.seconds.values()), 0.0)
+        rate = processed_files / total if total else 0
+        stages = ", ".join(f"{stage} {self.seconds[stage]:.2f}s" for stage in STAGES)
+        return f"{processed_files} files in {total:.2f}s ({rate:.0f} files/s): {stages}, other {other:.2f}s; {self.slow_files} slow"
+
+    def save(self, db: Session, scope: str, processed_files: int, matched_files: int, unmatched_files: int):
+        db.add(ImportScanRun(
+            StartedTimestamp=self.started_timestamp,
+            FinishedTimestamp=datetime.now().isoformat(),
+            Scope=scope,
+            FilesProcessed=processed_files,
+            FilesMatched=matched_files,
+            FilesUnmatched=unmatched_files,
+            TotalSeconds=round(self.total_seconds(), 3),
+            StageSeconds=json.dumps({stage: round(self.seconds[stage], 3) for stage in STAGES}),
+            SlowFiles=self.slow_files
+        ))
+        stale_ids = [
+            run_id for (run_id,) in db.query(ImportScanRun.Id)
+            .order_by(ImportScanRun.Id.desc())
+            .offset(KEEP_SCAN_RUNS)
+            .all()
+        ]
+        if stale_ids:
+            db.query(ImportScanRun).filter(ImportScanRun.Id.in_(stale_ids)).delete(synchronize_session=False)
+        db.commit()
+
+def load_slow_file_seconds(db: Session) -> float:
+    config_entry = db.query(Config).filter(Config.Key == "ImportSlowFileSeconds").first()
+    if not config_entry or not config_entry.Value:
+        return DEFAULT_SLOW_FILE_SECONDS
+    try:
+        return max(float(config_entry.Value), 0.0)
+    except ValueError:
+        logger.warning(f"Invalid ImportSlowFileSeconds '{config_entry.Value}', using {DEFAULT_SLOW_FILE_SECONDS}.")
+        return DEFAULT_SLOW_FILE_SECONDS
+
+def get_recent_runs(db: Session, limit: int = 50) -> list[ImportScanRun]:
+    return db.query(ImportScanRun).order_by(ImportScanRun.Id.desc()).limit(limit).all()
@@ -0,0 +1,159 @@
+# /app/utils/tag_reader.py
+import os
+import mmap
+import struct
+import logging
+from typing import NamedTuple
+
+# The fast path builds on mutagen internals (mutagen.id3._tags, mutagen.id3._util,
+# Frames[...]._fromData, ID3Tags._add) and is only tested against the mutagen range
+# pinned in requirements.txt; recheck it before widening that pin.
+try:
+    from mutagen.flac import StreamInfo, VCFLACDict
+    from mutagen.id3 import Frames, ID3Tags, ID3JunkFrameError
+    from mutagen.id3._tags import ID3Header, determine_bpi
+    from mutagen.id3._util import BitPaddedInt
+    from mutagen.mp3 import MPEGInfo
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Lookup keys per field, tried in order. Vorbis comment keys are case-insensitive,
+# the upper-case four letter keys are ID3 frame IDs.
+TAG_KEYS = {
+    'artist': ['artist', 'TPE1'],
+    'albumartist': ['albumartist', 'TPE2'],
+    'album': ['album', 'TALB'],
+    'title': ['title', 'TIT2', 'TITLE'],
+    'tracknumber': ['tracknumber', 'TRCK', 'TRACKNUMBER'],
+    'date': ['date', 'TDRC', 'TYER', 'YEAR'],
+    'discnumber': ['discnumber', 'TPOS'],
+}
+# TDAT and TIME are folded into TDRC together with TYER when the tag is upgraded to v2.4.
+ID3_FRAME_IDS = {key for keys in TAG_KEYS.values() for key in keys if len(key) == 4 and key.isupper()} | {"TDAT", "TIME"}
+# Unsynchronisation, extended header and footer; mutagen rejects the remaining flags.
+ID3_FALLBACK_FLAGS = 0xdf
+# v2.3: compression, encryption, grouping. v2.4: grouping, compression, encryption, unsync, data length.
+ID3_FRAME_FALLBACK_FLAGS = {3: 0x00e0, 4: 0x004f}
+ID3V1_SEARCH_BYTES = 131
+FLAC_STREAMINFO = 0
+FLAC_VORBIS_COMMENT = 4
+
+class TagData(NamedTuple):
+    tags: object
+    length: float | None
+
+class _Region:
+    # A slice of the mapped file that is only copied when indexed, so walking frame
+    # headers never reads the picture data between them.
+    def __init__(self, buffer: mmap.mmap, start: int, end: int):
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __getitem__(self, index: slice) -> bytes:
+        stop = self.end if index.stop is None else min(self.start + index.stop, self.end)
+        return self.buffer[self.start + (index.start or 0):stop]
+
+def _read_id3(f, data: mmap.mmap) -> TagData | None:
+    if data[:3] != b'ID3' or b'TAG' in data[-ID3V1_SEARCH_BYTES:]:
+        return None
+    major, revision, flags = data[3], data[4], data[5]
+    size_bytes = data[6:10]
+    if major not in ID3_FRAME_FALLBACK_FLAGS or flags & ID3_FALLBACK_FLAGS or any(b & 0x80 for b in size_bytes):
+        return None
+    tag_end = 10 + BitPaddedInt(size_bytes)
+    if tag_end > len(data):
+        return None
+
+    header = ID3Header()
+    header.version = (2, major, revision)
+    frame_region = _Region(data, 10, tag_end)
+    bpi = determine_bpi(frame_region, Frames) if major == 4 else int
+    frame_flags_mask = ID3_FRAME_FALLBACK_FLAGS[major]
+
+    tags = ID3Tags()
+    offset = 10
+    while offset + 10 <= tag_end:
+        name, size, frame_flags = struct.unpack('>4sLH', data[offset:offset + 10])
+        if name.strip(b'\x00') == b'':
+            break
+        size = bpi(size)
+        frame_start = offset + 10
+        offset = frame_start + size
+        if size == 0:
+            continue
+        try:
+            name = name.decode('ascii')
+        except UnicodeDecodeError:
+            continue
+        if name[-1] == '\x00' or frame_flags & frame_flags_mask:
+            return None
+        if name not in ID3_FRAME_IDS:
+            continue
+        try:
+            frame = Frames[name]._fromData(header, frame_flags, data[frame_start:min(offset, tag_end)])
+        except ID3JunkFrameError:
+            continue
+        tags._add(frame, False)
+    tags.update_to_v24()
+
+    info = MPEGInfo(f, tag_end)
+    return TagData(tags, info.length)
+
+def _read_flac(f, data: mmap.mmap) -> TagData | None:
+    if data[:4] != b'fLaC':
+        return None
+    stream_info = None
+    comments = None
+    offset = 4
+    last_block = False
+    while not last_block and (stream_info is None or comments is None):
+        if offset + 4 > len(data):
+            return None
+        code = data[offset] & 0x7f
+        last_block = bool(data[offset] & 0x80)
+        size = int.from_bytes(data[offset + 1:offset + 4], 'big')
+        block_start = offset + 4
+        offset = block_start + size
+        if code == FLAC_STREAMINFO and stream_info is None:
+            stream_info = StreamInfo(data[block_start:offset])
+        elif code == FLAC_VORBIS_COMMENT and comments is None:
+            # Some writers store a wrong size for this block; leave those to mutagen,
+            # which parses the comment itself to find where it ends.
+            f.seek(block_start)
+            comments = VCFLACDict(f)
+            if f.tell() != offset:
+                return None
+
+    if stream_info is None:
+        return None
+    return TagData(comments if comments is not None else {}, stream_info.length)
+
+def read_tags(file_path: str) -> TagData | None:
+    # Reads only the frames and blocks the importer looks up, leaving embedded pictures
+    # on disk. Returns None for anything unusual, and the caller loads the file with mutagen.
+    if not MUTAGEN_AVAILABLE:
+        return None
+    lower_path = file_path.lower()
+    if lower_path.endswith('.mp3'):
+        reader = _read_id3
+    elif lower_path.endswith('.flac'):
+        reader = _read_flac
+    else:
+        return None
+
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < 10:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return reader(f, data)
+    except Exception as e:
+        logger.debug(f"Fast tag read failed for {file_path}, falling back to mutagen: {e}")
+        return None
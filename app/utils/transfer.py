@@ -0,0 +1,176 @@
+# /app/utils/transfer.py
+import os
+import errno
+import shutil
+import hashlib
+import logging
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+TRANSFER_MODES = ["move", "hardlink", "reflink", "copy"]
+DEFAULT_TRANSFER_MODE = "move"
+VERIFY_OPTIONS = ["true", "false"]
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+FICLONE = 0x40049409
+PARTIAL_SUFFIX = ".releasarr-part"
+
+def _hash_file(path: str) -> bytes:
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        while chunk := f.read(COPY_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.digest()
+
+def _ficlone(source_fd: int, target_fd: int) -> bool:
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(target_fd, FICLONE, source_fd)
+        return True
+    except OSError:
+        return False
+
+def _copy_file_range(source_fd: int, target_fd: int, size: int) -> bool:
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            count = os.copy_file_range(source_fd, target_fd, min(COPY_CHUNK_SIZE, size - copied))
+            if count == 0:
+                break
+            copied += count
+    except OSError as e:
+        if copied == 0 and e.errno in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+            return False
+        raise
+    return copied == size
+
+def _sendfile_copy(source_fd: int, target_fd: int, size: int):
+    offset = 0
+    try:
+        while offset < size:
+            sent = os.sendfile(target_fd, source_fd, offset, min(COPY_CHUNK_SIZE, size - offset))
+            if sent == 0:
+                break
+            offset += sent
+    except OSError as e:
+        if offset or e.errno not in (errno.EINVAL, errno.ENOSYS):
+            raise
+    if offset < size:
+        os.lseek(source_fd, offset, os.SEEK_SET)
+        os.lseek(target_fd, offset, os.SEEK_SET)
+        while chunk := os.read(source_fd, COPY_CHUNK_SIZE):
+            os.write(target_fd, chunk)
+
+def _fsync_path(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class TransferSession:
+    # One per scan or manual match. Each copy is fsynced as it is written; finish(),
+    # which the importer calls after each committed batch, fsyncs every target
+    # directory once and only then removes the moved sources.
+    def __init__(self, mode: str = DEFAULT_TRANSFER_MODE, verify: bool = True):
+        self.mode = mode if mode in TRANSFER_MODES else DEFAULT_TRANSFER_MODE
+        self.verify = verify
+        self._unsynced_dirs: set[str] = set()
+        self._pending_removals: list[str] = []
+
+    def _copy(self, source_path: str, target_path: str, try_reflink: bool = False) -> str:
+        partial_path = target_path + PARTIAL_SUFFIX
+        method = "copy"
+        try:
+            with open(source_path, 'rb') as source, open(partial_path, 'wb') as target:
+                size = os.fstat(source.fileno()).st_size
+                if try_reflink and _ficlone(source.fileno(), target.fileno()):
+                    method = "reflink"
+                elif try_reflink and _copy_file_range(source.fileno(), target.fileno(), size):
+                    method = "copy_file_range"
+                else:
+                    _sendfile_copy(source.fileno(), target.fileno(), size)
+            shutil.copystat(source_path, partial_path)
+            _fsync_path(partial_path)
+
+            if self.verify and method != "reflink" and _hash_file(source_path) != _hash_file(partial_path):
+                raise OSError(errno.EIO, f"Checksum mismatch after copying '{source_path}'")
+            os.rename(partial_path, target_path)
+        except BaseException:
+            try:
+                os.remove(partial_path)
+            except OSError:
+                pass
+            raise
+
+        self._unsynced_dirs.add(os.path.dirname(target_path))
+        return method
+
+    def transfer(self, source_path: str, target_path: str) -> bool:
+        # Returns True when the source file stays in place.
+        if self.mode == "move":
+            try:
+                os.rename(source_path, target_path)
+                return False
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+            method = self._copy(source_path, target_path)
+            self._pending_removals.append(source_path)
+            logger.debug(f"Copied '{source_path}' across devices ({method}); the source is removed once the album is synced.")
+            return False
+
+        if self.mode == "hardlink":
+            try:
+                os.link(source_path, target_path)
+                return True
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                    raise
+                logger.debug(f"Could not hardlink '{source_path}' ({e}), copying instead.")
+            self._copy(source_path, target_path, try_reflink=True)
+            return True
+
+        self._copy(source_path, target_path, try_reflink=self.mode == "reflink")
+        return True
+
+    def undo(self, source_path: str, target_path: str):
+        # Drops a transfer that has not been finished yet, so its source is not removed later.
+        if source_path in self._pending_removals:
+            self._pending_removals.remove(source_path)
+        undo(source_path, target_path)
+
+    def finish(self):
+        unsynced_dirs, self._unsynced_dirs = self._unsynced_dirs, set()
+        pending_removals, self._pending_removals = self._pending_removals, []
+        try:
+            for dir_path in sorted(unsynced_dirs):
+                if os.path.isdir(dir_path):
+                    _fsync_path(dir_path)
+        except OSError as e:
+            logger.error(f"Could not sync copied files: {e}. Keeping {len(pending_removals)} source files in the import folder.")
+            return
+
+        for source_path in pending_removals:
+            try:
+                os.remove(source_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Could not remove '{source_path}' after copying it to the library: {e}")
+
+def undo(source_path: str, target_path: str):
+    if os.path.exists(source_path):
+        os.remove(target_path)
+        logger.info(f"Removed '{target_path}'; the source '{source_path}' is still in place")
+    else:
+        os.makedirs(os.path.dirname(source_path), exist_ok=True)
+        shutil.move(target_path, source_path)
+        logger.info(f"Moved '{target_path}' back to '{source_path}'")
@@ -0,0 +1,80 @@
+# /app/utils/worker_pool.py
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+WORKER_MODES = ["process", "thread"]
+DEFAULT_WORKER_MODE = "process"
+DEFAULT_WORKER_COUNT = min(8, os.cpu_count() or 1)
+
+_executor: Executor | None = None
+_executor_key: tuple[str, int] | None = None
+_process_pool_broken = False
+_lock = threading.Lock()
+
+def _create_executor(worker_mode: str, worker_count: int) -> Executor:
+    global _process_pool_broken
+    if worker_mode == "process" and not _process_pool_broken:
+        try:
+            executor = ProcessPoolExecutor(max_workers=worker_count, mp_context=multiprocessing.get_context("spawn"))
+            logger.info(f"Started process pool with {worker_count} workers for tag extraction.")
+            return executor
+        except (OSError, ImportError, NotImplementedError) as e:
+            _process_pool_broken = True
+            logger.warning(f"Process pool unavailable ({e}). Falling back to a thread pool.")
+
+    executor = ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="tag-worker")
+    logger.info(f"Started thread pool with {worker_count} workers for tag extraction.")
+    return executor
+
+def _get_executor(worker_mode: str, worker_count: int) -> Executor:
+    global _executor, _executor_key
+    with _lock:
+        if _executor is not None and _executor_key == (worker_mode, worker_count):
+            return _executor
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = _create_executor(worker_mode, worker_count)
+        _executor_key = (worker_mode, worker_count)
+        return _executor
+
+def _reset_executor():
+    global _executor, _executor_key
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _executor_key = None
+
+def parse_worker_settings(worker_mode: str | None, worker_count: str | None) -> tuple[str, int]:
+    mode = worker_mode if worker_mode in WORKER_MODES else DEFAULT_WORKER_MODE
+    try:
+        count = int(worker_count) if worker_count else DEFAULT_WORKER_COUNT
+    except ValueError:
+        logger.warning(f"Invalid worker count '{worker_count}', using {DEFAULT_WORKER_COUNT}.")
+        count = DEFAULT_WORKER_COUNT
+    return mode, max(1, count)
+
+def map_in_pool(func: Callable, items: list, worker_mode: str = DEFAULT_WORKER_MODE, worker_count: int = DEFAULT_WORKER_COUNT) -> list:
+    global _process_pool_broken
+    if worker_count <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    executor = _get_executor(worker_mode, worker_count)
+    chunksize = max(1, len(items) // (worker_count * 4))
+    try:
+        return list(executor.map(func, items, chunksize=chunksize))
+    except BrokenProcessPool as e:
+        logger.warning(f"Process pool broke during batch ({e}). Retrying batch in a thread pool.")
+        _process_pool_broken = True
+        _reset_executor()
+        return list(_get_executor("thread", worker_count).map(func, items))
+
+def shutdown():
+    _reset_executor()
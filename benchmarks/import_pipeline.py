@@ -0,0 +1,156 @@
+# /benchmarks/import_pipeline.py
+# Times scan_import_folder on a generated import tree, split into discovery, tag
+# extraction, cataloguing and file transfer using the importer's own stage timers.
+# Run from the repository root:
+#   python -m benchmarks.import_pipeline --artists 200 --albums 10 --tracks 25
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+import statistics
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models import Config, ImportScanRun
+from app.utils import importer, transfer, worker_pool
+from benchmarks.synthetic_library import FORMATS, generate_library
+
+logger = logging.getLogger(__name__)
+
+# Benchmark stages, built from the stage timers the importer stores for every scan run.
+STAGES = {
+    "discovery": ["walk", "stat"],
+    "tag_extraction": ["tag_parse"],
+    "catalogue": ["db_resolve", "commit"],
+    "transfer": ["move", "cleanup"],
+}
+
+def _tree_size(root: str) -> tuple[int, int]:
+    file_count = 0
+    total_bytes = 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.lower().endswith(importer.AUDIO_EXTENSIONS):
+                file_count += 1
+                total_bytes += os.path.getsize(os.path.join(dirpath, filename))
+    return file_count, total_bytes
+
+def run_once(args, run_dir: str) -> dict:
+    import_dir = os.path.join(run_dir, "import")
+    library_dir = os.path.join(args.library or run_dir, f"library-{os.path.basename(run_dir)}")
+    os.makedirs(import_dir)
+    os.makedirs(library_dir)
+
+    start = time.perf_counter()
+    generate_library(import_dir, args.artists, args.albums, args.tracks, args.depth, args.format, args.covers, args.singles, args.seed)
+    generate_seconds = time.perf_counter() - start
+    file_count, total_bytes = _tree_size(import_dir)
+
+    engine = create_engine(f"sqlite:///{os.path.join(run_dir, 'releasarr.db')}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    settings = {
+        "ImportFolderPath": import_dir,
+        "LibraryFolderPath": library_dir,
+        "ImportWorkerMode": args.worker_mode,
+        "ImportWorkerCount": str(args.worker_count),
+        "ImportCommitBatchSize": str(args.commit_batch_size),
+        "ImportTransferMode": args.transfer_mode,
+    }
+    for key, value in settings.items():
+        db.add(Config(Key=key, Value=value))
+    db.commit()
+
+    try:
+        start = time.perf_counter()
+        unmatched_count, matched_count = importer.scan_import_folder(db)
+        total_seconds = time.perf_counter() - start
+        scan_run = db.query(ImportScanRun).order_by(ImportScanRun.Id.desc()).first()
+        stage_seconds = json.loads(scan_run.StageSeconds) if scan_run else {}
+        slow_files = scan_run.SlowFiles if scan_run else 0
+    finally:
+        db.close()
+        engine.dispose()
+        if not args.keep:
+            shutil.rmtree(library_dir, ignore_errors=True)
+
+    return {
+        "files": file_count,
+        "bytes": total_bytes,
+        "matched": matched_count,
+        "unmatched": unmatched_count,
+        "generate_seconds": generate_seconds,
+        "total_seconds": total_seconds,
+        "slow_files": slow_files,
+        "importer_stages": stage_seconds,
+        "stages": {stage: sum(stage_seconds.get(name, 0.0) for name in names) for stage, names in STAGES.items()},
+    }
+
+def _print_results(results: list[dict]):
+    first = results[0]
+    print(f"\n{first['files']} files ({first['bytes'] / 1024 / 1024:.1f} MiB), {len(results)} run(s), median shown")
+    print(f"matched {first['matched']}, unmatched {first['unmatched']}, slow {first['slow_files']}")
+    total = statistics.median(result["total_seconds"] for result in results)
+    print(f"{'stage':<16}{'seconds':>10}{'share':>8}{'files/s':>12}")
+    for stage in STAGES:
+        seconds = statistics.median(result["stages"][stage] for result in results)
+        share = seconds / total * 100 if total else 0
+        rate = first["files"] / seconds if seconds else float("inf")
+        print(f"{stage:<16}{seconds:>10.3f}{share:>7.1f}%{rate:>12.0f}")
+    other = total - sum(statistics.median(result["stages"][stage] for result in results) for stage in STAGES)
+    print(f"{'other':<16}{max(other, 0):>10.3f}{max(other, 0) / total * 100 if total else 0:>7.1f}%{'':>12}")
+    print(f"{'total':<16}{total:>10.3f}{100:>7.1f}%{first['files'] / total if total else 0:>12.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the import pipeline on a synthetic library.")
+    parser.add_argument("--artists", type=int, default=20)
+    parser.add_argument("--albums", type=int, default=5)
+    parser.add_argument("--tracks", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=1)
+    parser.add_argument("--format", choices=FORMATS, default="mix")
+    parser.add_argument("--covers", choices=["file", "embedded", "mix", "none"], default="mix")
+    parser.add_argument("--singles", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--worker-mode", choices=worker_pool.WORKER_MODES, default=worker_pool.DEFAULT_WORKER_MODE)
+    parser.add_argument("--worker-count", type=int, default=worker_pool.DEFAULT_WORKER_COUNT)
+    parser.add_argument("--commit-batch-size", type=int, default=importer.DEFAULT_COMMIT_BATCH_SIZE)
+    parser.add_argument("--transfer-mode", choices=transfer.TRANSFER_MODES, default=transfer.DEFAULT_TRANSFER_MODE)
+    parser.add_argument("--workdir", help="Directory for the generated trees and databases (default: a new temp dir).")
+    parser.add_argument("--library", help="Parent directory for the library, e.g. on another filesystem to time cross-device moves.")
+    parser.add_argument("--json", help="Also write the raw results to this file.")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated trees, libraries and databases.")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper())
+    workdir = args.workdir or tempfile.mkdtemp(prefix="releasarr-bench-")
+    os.makedirs(workdir, exist_ok=True)
+
+    results = []
+    try:
+        for run in range(args.runs):
+            run_dir = tempfile.mkdtemp(prefix=f"run{run}-", dir=workdir)
+            result = run_once(args, run_dir)
+            results.append(result)
+            print(f"run {run + 1}/{args.runs}: {result['total_seconds']:.3f}s " + ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in result["stages"].items()), file=sys.stderr)
+            if not args.keep:
+                shutil.rmtree(run_dir, ignore_errors=True)
+    finally:
+        worker_pool.shutdown()
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    _print_results(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"arguments": vars(args), "runs": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
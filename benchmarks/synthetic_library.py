@@ -0,0 +1,142 @@
+# /benchmarks/synthetic_library.py
+import os
+import time
+import random
+import struct
+import argparse
+import logging
+
+from mutagen.flac import FLAC, Picture
+from mutagen.id3 import ID3, TPE1, TPE2, TALB, TIT2, TRCK, TPOS, TDRC, APIC
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ["mp3", "flac", "mix"]
+SAMPLE_RATE = 44100
+MP3_FRAME = b'\xff\xfb\x90\x00' + b'\x00' * 413
+COVER_BYTES = b'\xff\xd8\xff\xe0' + b'\x00' * 2048
+# Older than the importer's settle window and racy-mtime window, so the first scan
+# treats every generated file as finished.
+SETTLED_AGE_SECONDS = 3600
+
+def _write_flac_stub(path: str, seconds: int):
+    total_samples = SAMPLE_RATE * seconds
+    packed = (SAMPLE_RATE << 44) | (1 << 41) | (15 << 36) | total_samples
+    stream_info = struct.pack('>HH', 4096, 4096) + b'\x00' * 6 + packed.to_bytes(8, 'big') + b'\x00' * 16
+    with open(path, 'wb') as f:
+        f.write(b'fLaC' + bytes([0x80]) + len(stream_info).to_bytes(3, 'big') + stream_info + b'\x00' * 64)
+
+def _write_mp3_stub(path: str, frames: int):
+    with open(path, 'wb') as f:
+        f.write(MP3_FRAME * frames)
+
+def write_track(path: str, fmt: str, tags: dict, embedded_cover: bool = False, seconds: int = 3):
+    if fmt == "flac":
+        _write_flac_stub(path, seconds)
+        audio = FLAC(path)
+        audio['artist'] = tags['artist']
+        audio['album'] = tags['album']
+        audio['title'] = tags['title']
+        audio['tracknumber'] = f"{tags['track']}/{tags['total']}"
+        audio['discnumber'] = str(tags['disc'])
+        audio['date'] = str(tags['year'])
+        if tags.get('albumartist'):
+            audio['albumartist'] = tags['albumartist']
+        if embedded_cover:
+            picture = Picture()
+            picture.type = 3
+            picture.mime = 'image/jpeg'
+            picture.data = COVER_BYTES
+            audio.add_picture(picture)
+        audio.save()
+        return
+
+    _write_mp3_stub(path, seconds * 38)
+    id3 = ID3()
+    id3.add(TPE1(encoding=3, text=tags['artist']))
+    id3.add(TALB(encoding=3, text=tags['album']))
+    id3.add(TIT2(encoding=3, text=tags['title']))
+    id3.add(TRCK(encoding=3, text=f"{tags['track']}/{tags['total']}"))
+    id3.add(TPOS(encoding=3, text=str(tags['disc'])))
+    id3.add(TDRC(encoding=3, text=str(tags['year'])))
+    if tags.get('albumartist'):
+        id3.add(TPE2(encoding=3, text=tags['albumartist']))
+    if embedded_cover:
+        id3.add(APIC(encoding=3, mime='image/jpeg', type=3, desc='Cover', data=COVER_BYTES))
+    id3.save(path)
+
+def _album_dir(root: str, artist_index: int, album_index: int, depth: int) -> str:
+    parts = [f"Drop {artist_index % 10:02d}", f"Batch {album_index % 10:02d}", "Incoming"][:max(depth - 1, 0)]
+    return os.path.join(root, *parts, f"Artist {artist_index:04d} - Album {album_index:03d}")
+
+def generate_library(root: str, artists: int = 10, albums: int = 5, tracks: int = 10, depth: int = 1, fmt: str = "mix", covers: str = "file", singles: int = 0, seed: int = 1) -> int:
+    rng = random.Random(seed)
+    file_count = 0
+
+    for artist_index in range(artists):
+        artist = f"Artist {artist_index:04d}"
+        for album_index in range(albums):
+            album_dir = _album_dir(root, artist_index, album_index, depth)
+            os.makedirs(album_dir, exist_ok=True)
+            album = f"Album {album_index:03d}"
+            year = rng.randint(1970, 2024)
+            discs = 2 if tracks >= 12 and rng.random() < 0.2 else 1
+            embedded = covers == "embedded" or (covers == "mix" and rng.random() < 0.5)
+
+            for track in range(1, tracks + 1):
+                track_format = fmt if fmt != "mix" else rng.choice(("mp3", "flac"))
+                disc = 1 if discs == 1 or track <= tracks // 2 else 2
+                title = f"Song {track:02d}"
+                tags = {
+                    'artist': f"{artist} feat. Guest {track}" if rng.random() < 0.1 else artist,
+                    'albumartist': artist,
+                    'album': album,
+                    'title': title,
+                    'track': track,
+                    'total': tracks,
+                    'disc': disc,
+                    'year': year,
+                }
+                write_track(os.path.join(album_dir, f"{track:02d} - {title}.{track_format}"), track_format, tags, embedded_cover=embedded and track == 1)
+                file_count += 1
+
+            if covers == "file" or (covers == "mix" and not embedded):
+                with open(os.path.join(album_dir, "cover.jpg"), 'wb') as f:
+                    f.write(COVER_BYTES)
+
+    if singles:
+        singles_dir = os.path.join(root, "Singles")
+        os.makedirs(singles_dir, exist_ok=True)
+        for single_index in range(singles):
+            title = f"Single {single_index:04d}"
+            tags = {'artist': f"Solo {single_index:04d}", 'album': title, 'title': title, 'track': 1, 'total': 1, 'disc': 1, 'year': 2020}
+            write_track(os.path.join(singles_dir, f"{title}.mp3"), "mp3", tags)
+            file_count += 1
+
+    settled_time = time.time() - SETTLED_AGE_SECONDS
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            os.utime(os.path.join(dirpath, filename), (settled_time, settled_time))
+
+    logger.info(f"Generated {file_count} audio files under {root}.")
+    return file_count
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic, tagged import folder.")
+    parser.add_argument("root")
+    parser.add_argument("--artists", type=int, default=10)
+    parser.add_argument("--albums", type=int, default=5)
+    parser.add_argument("--tracks", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=1)
+    parser.add_argument("--format", choices=FORMATS, default="mix")
+    parser.add_argument("--covers", choices=["file", "embedded", "mix", "none"], default="file")
+    parser.add_argument("--singles", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    os.makedirs(args.root, exist_ok=True)
+    generate_library(args.root, args.artists, args.albums, args.tracks, args.depth, args.format, args.covers, args.singles, args.seed)
+
+if __name__ == "__main__":
+    main()